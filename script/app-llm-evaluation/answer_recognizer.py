@@ -0,0 +1,30 @@
+import re
+
+# A complete answer at the start of a reply, confirmed by the character that follows it
+# (a lone "A" could still be the start of "ANSWER", "1." of "1.8" and "A;" of "A;C")
+ANSWER_PATTERNS = {
+    "MCQ": re.compile(r"\s*[*(\[]*\s*([A-D])(?=[^A-Z0-9])"),
+    "MSQ": re.compile(r"\s*[*(\[]*\s*([A-D](?:\s*[;,]?\s*[A-D])*)(?=[ \t]*(?:\n|[^A-Z0-9;,\s]))"),
+    "NAT": re.compile(r"\s*[*]*\s*(-?\d+(?:\.\d+)?)(?=[^\d.,E])"),
+}
+# Replies that do not start with an answer within this many characters are read to the end
+SEARCH_LIMIT = 64
+
+
+class AnswerRecognizer:
+    # Fed the streamed reply chunk by chunk; `feed` returns the answer as soon as a complete,
+    # well-formed one has been seen (the rest of the reply can then be cancelled)
+    def __init__(self, q_type):
+        self.pattern = ANSWER_PATTERNS[q_type]
+        self.text = ""
+        self.answer = None
+
+    def feed(self, chunk):
+        if self.answer is not None or len(self.text) > SEARCH_LIMIT:
+            self.text += chunk
+            return self.answer
+        self.text += chunk
+        match = self.pattern.match(self.text.upper())
+        if match:
+            self.answer = match.group(1)
+        return self.answer
@@ -0,0 +1,355 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import asyncio
+import socket
+import cProfile
+import subprocess
+import platform
+import resource
+import argparse
+import tempfile
+import threading
+import contextlib
+import statistics
+import functools
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# End-to-end benchmark of the evaluation pipeline on generated fixture PDFs and the mock model
+# server: download -> extract_text -> clean_text -> parse_questions -> ask_model -> scoring ->
+# resultProcess. Every stage records its wall time, CPU time (including worker processes) and
+# peak RSS; results are written as JSON and can be compared with an earlier run.
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+STAGES = ("download", "extract_text", "clean_text", "parse_questions", "ask_model", "scoring", "resultProcess")
+PAPER_URL_NAME = "CS99set1-questionPaper.pdf"
+KEY_URL_NAME = "CS99set1-answerKey.pdf"
+QUESTIONS_PER_PAGE = 3
+KEY_LINES_PER_PAGE = 50
+
+
+def fixture_pages(count, seed=0):
+    # Question paper and answer key pages laid out like a GATE CS paper: a subject header and
+    # an institute footer on every page, "Q.<n>" blocks with "(A)".."(D)" options, and one
+    # "<n> <session> <type> <section> <key> <marks>" line per question in the key
+    rng = random.Random(seed)
+    page_count = -(-count // QUESTIONS_PER_PAGE)
+    paper, key, page = [], [["Q. No. Session Question Type Section Key/Range Mark"]], []
+    for n in range(1, count + 1):
+        q_type = rng.choice(["MCQ", "MSQ", "NAT"])
+        if not page:
+            page.append("Computer Science and Information Technology (CS1)")
+        page.append(f"Q.{n} Consider a directed graph G with {rng.randint(5, 500)} vertices in which every vertex")
+        page.append(f"has out-degree {rng.randint(1, 9)}. Which of the following statements about G is TRUE?")
+        if q_type != "NAT":
+            for option in "ABCD":
+                page.append(f"({option}) Statement {option} about the vertex {rng.randint(1, 99)} of G")
+        if n % QUESTIONS_PER_PAGE == 0 or n == count:
+            page.append(f"Organising Institute: IIT Roorkee Page {len(paper) + 1} of {page_count}")
+            paper.append(page)
+            page = []
+
+        answer = {"MCQ": rng.choice("ABCD"), "MSQ": ";".join(sorted(rng.sample("ABCD", 2))), "NAT": f"{rng.randint(1, 9)} to {rng.randint(10, 20)}"}[q_type]
+        if len(key[-1]) >= KEY_LINES_PER_PAGE:
+            key.append([])
+        key[-1].append(f"{n} 1 {q_type} CS {answer} {1 if n <= 35 else 2}")
+    return paper, key
+
+
+def pdf_string(text):
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def write_pdf(path, pages, font_size=10, leading=14):
+    # Minimal PDF with one Helvetica text line per entry, enough for pdfplumber to extract
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        ops = [f"BT /F1 {font_size} Tf {leading} TL 50 800 Td"] + [f"{pdf_string(line)} Tj T*" for line in lines] + ["ET"]
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R /Resources << /Font << /F1 3 0 R >> >> >>" % (len(objects)))
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode("latin-1")
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    with open(path, "wb") as f:
+        f.write(out.getvalue())
+
+
+def serve_directory(path):
+    # Static file server for the fixture PDFs, so the download stage goes through HTTP
+    handler = functools.partial(type("FixtureHandler", (SimpleHTTPRequestHandler,), {"log_message": lambda *args: None}), directory=path)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def start_mock_process(**options):
+    # mock_server.py in its own process, so its CPU time and memory stay out of the measurements
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.realpath(__file__)), "mock_server.py"), "--port", str(port)]
+    for name, value in options.items():
+        command += [f"--{name.replace('_', '-')}", str(value)]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    if not server.stdout.readline():
+        raise RuntimeError(f"Mock model server failed to start: {' '.join(command)}")
+    return server, f"http://127.0.0.1:{port}/v1"
+
+
+def current_rss():
+    # Resident set size in bytes from /proc, or the process high-water mark where /proc is missing
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageTimer:
+    # Times each stage; with `profile_dir`, each stage is also run under cProfile and its
+    # statistics dumped to <profile_dir>/<stage>.prof (view with `python -m pstats` or snakeviz)
+    def __init__(self, profile_dir=None, interval=0.005):
+        self.profile_dir = profile_dir
+        self.interval = interval
+        self.results = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        peak = [current_rss()]
+        done = threading.Event()
+
+        def sample():
+            # Peak RSS during the stage, sampled in the background
+            while not done.wait(self.interval):
+                peak[0] = max(peak[0], current_rss())
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        profiler = cProfile.Profile() if self.profile_dir else None
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu, wall = time.process_time(), time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+            wall = time.perf_counter() - wall
+            after = resource.getrusage(resource.RUSAGE_CHILDREN)
+            cpu = time.process_time() - cpu + (after.ru_utime + after.ru_stime) - (children.ru_utime + children.ru_stime)
+            done.set()
+            sampler.join()
+            peak[0] = max(peak[0], current_rss())
+            self.results[name] = {"wall": wall, "cpu": cpu, "peak_rss_mb": peak[0] / 2 ** 20}
+            if profiler:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{name}.prof"))
+
+
+def run_pipeline(args, fixture_url, work_dir, parser, process, timer, log):
+    # One pass through every stage with fresh artifact, result and store directories
+    paper_pdf = os.path.join(work_dir, "paper.pdf")
+    key_pdf = os.path.join(work_dir, "key.pdf")
+    store_dir = os.path.join(work_dir, "artifacts")
+    os.environ['MLC_GATE_QUESTION_PDF_URL'] = f"{fixture_url}/{PAPER_URL_NAME}"
+    os.environ['MLC_LLM_RESULTS_DB'] = os.path.join(work_dir, "results.sqlite")
+
+    with timer.stage("download"), log:
+        parser.download_pdf(f"{fixture_url}/{PAPER_URL_NAME}", paper_pdf, store_dir)
+        parser.download_pdf(f"{fixture_url}/{KEY_URL_NAME}", key_pdf, store_dir)
+    with timer.stage("extract_text"), log:
+        paper_text = parser.extract_text(paper_pdf, args.extract_workers)
+        key_text = parser.extract_text(key_pdf, 1)
+    with timer.stage("clean_text"), log:
+        paper_text = parser.clean_text(paper_text)
+        key_text = parser.clean_text(key_text)
+    with timer.stage("parse_questions"), log:
+        questions = parser.parse_questions(paper_text, parser.parse_answers(key_text))
+
+    model_name = process.get_model_info("local")
+    run = {
+        "type": "local",
+        "name": model_name,
+        "instance": process.initialize_model("local", model_name),
+        "rate_limits": process.get_rate_limits("local", model_name),
+        "journal": None,
+        "done": {},
+        "label": "",
+        "previous": {},
+        **process.run_settings(os.environ, "local"),
+    }
+    with timer.stage("ask_model"), log:
+        questions = asyncio.run(process.evaluate_models([run], questions, None))
+    with timer.stage("scoring"), log:
+        run["output"] = process.report_run(run, questions, PAPER_URL_NAME, process.load_scheme(os.environ.get('MLC_LLM_MARKING_SCHEME')))
+    with timer.stage("resultProcess"), log:
+        process.resultProcess({"state": {"runs": [{"model_info": process.run_model_info(run), "output": run["output"], "metrics": run["metrics"]}]}})
+
+    correct = sum(1 for r in run["output"] if r["is_correct"])
+    return {"questions": len(questions), "correct": correct, "requests": process.metrics.summarize(run["metrics"])["requests"]}
+
+
+def summarize(samples):
+    return {"min": round(min(samples), 6), "median": round(statistics.median(samples), 6), "max": round(max(samples), 6)}
+
+
+def compare(report, baseline, threshold, min_delta=0.005):
+    # Per-stage change of the median wall time; stages slower by more than `threshold` (and by
+    # at least `min_delta` seconds, so sub-millisecond stages do not flag noise) regressed
+    rows, regressed = [], []
+    for stage, result in report["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if not before:
+            continue
+        now, then = result["wall"]["median"], before["wall"]["median"]
+        change = (now - then) / then if then else 0.0
+        rows.append((stage, then, now, change))
+        if change > threshold and now - then >= min_delta:
+            regressed.append(stage)
+    return rows, regressed
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark on fixture PDFs and the mock model server")
+    parser.add_argument("--questions", type=int, default=65, help="questions in the fixture paper")
+    parser.add_argument("--repeat", type=positive_int, default=3, help="timed passes through the whole pipeline")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--extract-workers", type=int, default=1, help="processes used by extract_text")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock server latency per request (s)")
+    parser.add_argument("--capacity", type=int, default=8, help="requests the mock server serves at once")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests the mock server fails")
+    parser.add_argument("--rpm", type=int, default=0, help="mock server requests/min limit (0: unlimited)")
+    parser.add_argument("--accuracy", type=float, default=0.7, help="mock model accuracy")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="evaluation setting, e.g. MLC_LLM_BATCH_SIZE=8 (repeatable)")
+    parser.add_argument("--profile", metavar="DIR", help="dump a cProfile of every stage to DIR/<stage>.prof (from an extra, untimed pass)")
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare median stage times with an earlier JSON report")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown (fraction) reported as a regression by --compare")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="smallest slowdown (s) reported as a regression by --compare")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    args = parser.parse_args(argv)
+
+    for item in args.env:
+        name, _, value = item.partition("=")
+        os.environ[name.strip()] = value.strip()
+    os.environ.setdefault('MLC_LLM_RPM', '60000')
+    work_root = tempfile.mkdtemp(prefix="gate-bench-")
+    os.environ['MLC_LLM_RESULTS_DIR'] = os.path.join(work_root, "results")
+
+    import process
+    parser_module = process.load_parser_module()
+    mock = None
+    try:
+        fixtures = os.path.join(work_root, "fixtures")
+        os.makedirs(fixtures)
+        paper_pages, key_pages = fixture_pages(args.questions, args.seed)
+        write_pdf(os.path.join(fixtures, PAPER_URL_NAME), paper_pages)
+        write_pdf(os.path.join(fixtures, KEY_URL_NAME), key_pages)
+
+        # The mock model knows the answer key, so scores vary with --accuracy only
+        key_file = os.path.join(fixtures, "questions.json")
+        answers = parser_module.parse_answers("\n".join(line for page in key_pages for line in page))
+        questions = parser_module.parse_questions(parser_module.clean_text("\n".join(line for page in paper_pages for line in page)), answers)
+        with open(key_file, "w", encoding="utf-8") as f:
+            json.dump(questions, f)
+
+        file_server, fixture_url = serve_directory(fixtures)
+        mock, mock_url = start_mock_process(seed=args.seed, latency=args.latency, capacity=args.capacity, error_rate=args.error_rate,
+                                            rpm=args.rpm, accuracy=args.accuracy, questions=key_file)
+        os.environ['MLC_LOCAL_BASE_URL'] = mock_url
+
+        passes, stages = [], {stage: [] for stage in STAGES}
+        # Profiling slows every stage down, so the profiled pass comes after the timed ones
+        for n in range(args.repeat + (1 if args.profile else 0)):
+            profiled = n == args.repeat
+            timer = StageTimer(args.profile if profiled else None)
+            work_dir = os.path.join(work_root, f"pass{n}")
+            os.makedirs(work_dir)
+            log = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+            outcome = run_pipeline(args, fixture_url, work_dir, parser_module, process, timer, log)
+            if profiled:
+                continue
+            passes.append(outcome)
+            for stage, result in timer.results.items():
+                stages[stage].append(result)
+            print(f"Pass {n + 1}/{args.repeat}: " + ", ".join(f"{stage} {r['wall']:.3f}s" for stage, r in timer.results.items()), file=sys.stderr)
+        file_server.shutdown()
+    finally:
+        if mock:
+            mock.terminate()
+            mock.wait()
+        shutil.rmtree(work_root, ignore_errors=True)
+
+    report = {
+        "benchmark": "pipeline",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": dict({k: v for k, v in vars(args).items() if k not in ("output", "compare", "verbose")},
+                         env={k: v for k, v in os.environ.items() if k.startswith("MLC_LLM_")}),
+        "passes": passes,
+        "stages": {stage: {
+            "wall": summarize([r["wall"] for r in results]),
+            "cpu": summarize([r["cpu"] for r in results]),
+            "peak_rss_mb": round(max(r["peak_rss_mb"] for r in results), 1),
+        } for stage, results in stages.items() if results},
+    }
+    report["total_wall"] = round(sum(s["wall"]["median"] for s in report["stages"].values()), 6)
+
+    print(f"{'Stage':<16} {'Wall (s)':>10} {'CPU (s)':>10} {'Peak RSS (MB)':>14}")
+    for stage, result in report["stages"].items():
+        print(f"{stage:<16} {result['wall']['median']:>10.4f} {result['cpu']['median']:>10.4f} {result['peak_rss_mb']:>14.1f}")
+    print(f"{'total':<16} {report['total_wall']:>10.4f}")
+    outcome = {field: statistics.median(p[field] for p in passes) for field in ("questions", "requests", "correct")}
+    print(f"{outcome['questions']:g} questions, {outcome['requests']:g} requests, {outcome['correct']:g} correct (median of {len(passes)} passes)")
+    if args.profile:
+        print(f"Stage profiles written to {args.profile}/<stage>.prof")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to: {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            rows, regressed = compare(report, json.load(f), args.threshold, args.min_delta)
+        print(f"{'Stage':<16} {'Baseline (s)':>12} {'Now (s)':>10} {'Change':>8}")
+        for stage, then, now, change in rows:
+            print(f"{stage:<16} {then:>12.4f} {now:>10.4f} {change:>+8.1%}{'  REGRESSION' if stage in regressed else ''}")
+        if regressed:
+            print(f"Slower by more than {args.threshold:.0%}: {', '.join(regressed)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import os
+import json
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+# Per-request timings summarized with percentiles (seconds)
+TIMING_FIELDS = ("latency", "first_token", "limiter_wait", "slot_wait", "backoff")
+
+
+def new_record(question_number, q_type):
+    # One record per question asked: timings in seconds, token counts as reported by the SDK
+    # (None when the provider does not report usage), the exception class of every failed
+    # attempt (retried or not) and that of the call that finally failed.
+    # Questions packed into one request share its timings and split its tokens.
+    return {
+        "question_number": question_number,
+        "type": q_type,
+        "cached": False,
+        "latency": 0.0,
+        "first_token": None,     # time to the first streamed token (streaming mode)
+        "stopped_early": False,  # stream cancelled once the answer was read
+        "limiter_wait": 0.0,
+        "slot_wait": 0.0,
+        "backoff": 0.0,
+        "retries": 0,
+        "pack_size": 1,          # questions answered by the request (packed or batched mode)
+        "fallback": False,       # asked again on its own after a malformed packed reply
+        "samples": 1,            # requests whose answers were voted on (self-consistency mode)
+        "agreement": None,       # fraction of the samples agreeing with the voted answer
+        "vote_time": None,       # time from the first sample sent to the vote (self-consistency mode)
+        "prompt_tokens": None,
+        "completion_tokens": None,
+        "cached_tokens": None,   # prompt tokens served from the provider's prompt cache
+        "errors": [],            # exception class of each failed attempt, in order
+        "error": None,
+    }
+
+
+def read_usage(response, model_type):
+    # (prompt_tokens, completion_tokens, cached_tokens) from an SDK response, None where not reported
+    if model_type == "gemini":
+        usage = getattr(response, "usage_metadata", None)
+        return (getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None),
+                getattr(usage, "cached_content_token_count", None))
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    return getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None), getattr(details, "cached_tokens", None)
+
+
+def percentiles(values):
+    if not values:
+        return dict({f"p{p}": None for p in PERCENTILES}, mean=None)
+    points = np.percentile(np.asarray(values, dtype=float), PERCENTILES)
+    return dict({f"p{p}": round(float(v), 4) for p, v in zip(PERCENTILES, points)}, mean=round(float(np.mean(values)), 4))
+
+
+def request_count(record):
+    # Requests sent for a question: its share of a packed request (or its samples) plus a fallback request
+    return record.get("samples", 1) / record.get("pack_size", 1) + (1 if record.get("fallback") else 0)
+
+
+def error_counts(records):
+    # Failed requests by exception class. A packed or batched request that failed is listed in
+    # the record of every question it carried, so each listing counts as its share of one request.
+    counts = {}
+    for r in records:
+        for error in r.get("errors", []):
+            counts[error] = counts.get(error, 0) + 1 / r.get("pack_size", 1)
+    return {error: round(count) for error, count in sorted(counts.items())}
+
+
+def cost_per_question(records):
+    # Mean requests, tokens and time per question sent; the time is the wall time of the vote
+    # in self-consistency mode and the request latency otherwise
+    sent = [r for r in records if not r["cached"]]
+    if not sent:
+        return None
+    return {
+        "questions": len(sent),
+        "requests": round(sum(request_count(r) for r in sent) / len(sent), 3),
+        "tokens": round(sum((r["prompt_tokens"] or 0) + (r["completion_tokens"] or 0) for r in sent) / len(sent), 1),
+        "latency": round(sum(r["vote_time"] if r.get("vote_time") is not None else r["latency"] for r in sent) / len(sent), 4),
+    }
+
+
+def summarize(records):
+    # Summary of one group of records; cached answers are counted but left out of the timings
+    sent = [r for r in records if not r["cached"]]
+    summary = {
+        "questions": len(sent),
+        "requests": round(sum(request_count(r) for r in sent)),
+        "cached": len(records) - len(sent),
+        "fallbacks": sum(1 for r in sent if r.get("fallback")),
+        "stopped_early": sum(1 for r in sent if r.get("stopped_early")),
+        "errors": sum(error_counts(sent).values()),
+        "failed": sum(1 for r in sent if r["error"]),
+        "retries": round(sum(r["retries"] / r.get("pack_size", 1) for r in sent)),
+        "prompt_tokens": round(sum(r["prompt_tokens"] or 0 for r in sent)),
+        "completion_tokens": round(sum(r["completion_tokens"] or 0 for r in sent)),
+        "cached_tokens": round(sum(r.get("cached_tokens") or 0 for r in sent)),
+    }
+    for field in TIMING_FIELDS:
+        summary[field] = percentiles([r[field] for r in sent if r.get(field) is not None])
+    return summary
+
+
+def summarize_by(records, key):
+    groups = {}
+    for r in records:
+        groups.setdefault(key(r), []).append(r)
+    return {name: summarize(group) for name, group in sorted(groups.items())}
+
+
+def summarize_runs(runs):
+    # runs: [{"model_info": {"type", "name"}, "metrics": [records]}] -> summaries by provider,
+    # model and question type
+    records = [dict(r, provider=run["model_info"]["type"], model=run["model_info"]["name"]) for run in runs for r in run["metrics"]]
+    return {
+        "overall": summarize(records),
+        "by_provider": summarize_by(records, lambda r: r["provider"]),
+        "by_model": summarize_by(records, lambda r: r["model"]),
+        "by_type": summarize_by(records, lambda r: r["type"]),
+        "by_provider_type": summarize_by(records, lambda r: f"{r['provider']}/{r['type']}"),
+    }
+
+
+def write_json(path, runs):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "summary": summarize_runs(runs),
+            "requests": {run["model_info"]["name"]: run["metrics"] for run in runs},
+        }, f, indent=2)
+
+
+def prometheus_labels(labels):
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def write_prometheus(path, runs):
+    # Node-exporter textfile collector format, labelled by provider, model and question type.
+    # Written to a temporary file and renamed so the collector never reads a partial file.
+    groups = {}
+    for run in runs:
+        for r in run["metrics"]:
+            if not r["cached"]:
+                labels = {"provider": run["model_info"]["type"], "model": run["model_info"]["name"], "type": r["type"]}
+                groups.setdefault(tuple(labels.items()), []).append(r)
+
+    lines = []
+    for field, help_text in (("latency", "Model request latency"),
+                             ("first_token", "Time to the first streamed token"),
+                             ("limiter_wait", "Time spent waiting on the rate limiter"),
+                             ("slot_wait", "Time spent waiting for a free concurrency slot"),
+                             ("backoff", "Time spent backing off before retries")):
+        name = f"llm_request_{field}_seconds"
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+        for group, records in groups.items():
+            labels = dict(group)
+            values = [r[field] for r in records if r.get(field) is not None]
+            if not values:
+                continue
+            for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+                lines.append(f"{name}{prometheus_labels(dict(labels, quantile=p / 100))} {float(v):g}")
+            lines.append(f"{name}_sum{prometheus_labels(labels)} {sum(values):g}")
+            lines.append(f"{name}_count{prometheus_labels(labels)} {len(values)}")
+
+    counters = (
+        ("llm_requests_total", "Model requests sent", request_count),
+        ("llm_request_retries_total", "Retries of model requests", lambda r: r["retries"] / r.get("pack_size", 1)),
+        ("llm_prompt_tokens_total", "Prompt tokens reported by the provider", lambda r: r["prompt_tokens"] or 0),
+        ("llm_completion_tokens_total", "Completion tokens reported by the provider", lambda r: r["completion_tokens"] or 0),
+        ("llm_cached_prompt_tokens_total", "Prompt tokens served from the provider's prompt cache", lambda r: r.get("cached_tokens") or 0),
+    )
+    for name, help_text, value in counters:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for group, records in groups.items():
+            lines.append(f"{name}{prometheus_labels(dict(group))} {round(sum(value(r) for r in records)):g}")
+
+    name = "llm_request_errors_total"
+    lines += [f"# HELP {name} Failed model requests by exception class, including retried ones", f"# TYPE {name} counter"]
+    for group, records in groups.items():
+        for error, count in error_counts(records).items():
+            lines.append(f"{name}{prometheus_labels(dict(group, error=error))} {count}")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(path + ".tmp", path)
+
+
+def format_summary(summary):
+    # One line for the console report
+    latency = summary["latency"]
+    if latency["p50"] is None:
+        return f"{summary['cached']} cached, no requests sent"
+    return (f"{summary['requests']} requests for {summary['questions']} questions, latency p50/p95/p99 {latency['p50']:.2f}/{latency['p95']:.2f}/{latency['p99']:.2f}s, "
+            f"limiter wait p95 {summary['limiter_wait']['p95']:.2f}s, {summary['retries']} retries, {summary['errors']} errors, "
+            f"{summary['prompt_tokens']} prompt ({summary['cached_tokens']} cached) + {summary['completion_tokens']} completion tokens"
+            + (f", {summary['stopped_early']} streams cut off early" if summary["stopped_early"] else ""))
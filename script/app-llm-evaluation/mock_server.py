@@ -0,0 +1,273 @@
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Deterministic OpenAI-compatible server for offline benchmarks of the evaluation pipeline.
+# Serves /v1/chat/completions (optionally streamed), /v1/completions (a list of prompts is
+# answered as one batch), /v1/models and /stats. Replies depend only on the prompt, the seed
+# and, for sampled (temperature > 0) requests, the request count, so two runs against the
+# same server settings get the same answers.
+
+PACKED_QUESTION_RE = re.compile(r"Question (\d+) \((MCQ|MSQ|NAT)")
+DEFAULTS = {
+    "model": "local-model",
+    "seed": 0,
+    "latency": 0.05,           # seconds per request
+    "jitter": 0.0,             # up to this many seconds added at random
+    "token_latency": 0.0,      # seconds per completion token (streamed token by token)
+    "batch_overhead": 0.1,     # extra latency per additional prompt of a batch, as a fraction of `latency`
+    "capacity": 8,             # requests served at once; the rest queue
+    "error_rate": 0.0,         # fraction of requests failed with a 503
+    "rpm": 0,                  # requests per minute before answering 429 (0: unlimited)
+    "tpm": 0,                  # tokens per minute before answering 429 (0: unlimited)
+    "accuracy": 0.7,           # chance of the correct answer when the answer key is known
+    "ramble": 0,               # words of explanation after the answer
+    "questions": None,         # parsed questions (JSON/JSONL) supplying the answer key
+}
+
+
+def load_answer_key(path):
+    # [(question text, type, answer)] from the parse step's output
+    if not path:
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    records = json.loads(text) if text.lstrip().startswith("[") else [json.loads(line) for line in text.splitlines() if line.strip()]
+    key = []
+    for q in records:
+        answer = q.get("answer")
+        if isinstance(answer, list):
+            answer = ";".join(answer)
+        if q.get("question") and answer:
+            key.append((q["question"].strip(), q["type"], str(answer).strip().upper()))
+    return key
+
+
+class MockModel:
+    # Answers and server-side limits, shared by all request handler threads
+    def __init__(self, **options):
+        self.options = dict(DEFAULTS, **options)
+        self.key = load_answer_key(self.options["questions"])
+        self.errors = random.Random(f"errors:{self.options['seed']}")
+        self.slots = threading.BoundedSemaphore(self.options["capacity"])
+        self.lock = threading.Lock()
+        self.window = deque()  # (time, tokens) of the requests of the last minute
+        self.draws = 0
+        self.stats = {"requests": 0, "prompts": 0, "errors": 0, "throttled": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def rng(self, prompt, temperature):
+        # Greedy requests get the same reply every time, sampled requests a fresh draw
+        with self.lock:
+            if temperature:
+                self.draws += 1
+            draw = self.draws if temperature else 0
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return random.Random(f"{self.options['seed']}:{digest}:{draw}")
+
+    def answer(self, prompt, temperature=0):
+        rng = self.rng(prompt, temperature)
+        packed = list(PACKED_QUESTION_RE.finditer(prompt))
+        if packed:
+            # Each numbered question of a packed prompt is answered from its own block
+            ends = [m.start() for m in packed[1:]] + [len(prompt)]
+            return json.dumps({m.group(1): self.pick(rng, prompt[m.start():end], m.group(2)) for m, end in zip(packed, ends)})
+        q_type = "MSQ" if "multiple select" in prompt else "NAT" if "numerical answer" in prompt else "MCQ"
+        reply = self.pick(rng, prompt, q_type)
+        if self.options["ramble"]:
+            reply += "\n" + " ".join(rng.choice(("because", "the", "answer", "follows", "from", "this")) for _ in range(self.options["ramble"]))
+        return reply
+
+    def pick(self, rng, prompt, q_type):
+        # The correct answer with probability `accuracy` when the question is in the answer key,
+        # a plausible wrong one otherwise
+        correct = next((answer for text, key_type, answer in self.key if key_type == q_type and text in prompt), None)
+        if correct and rng.random() < self.options["accuracy"]:
+            return correct.split(" TO ")[0]
+        if q_type == "MCQ":
+            return rng.choice([o for o in "ABCD" if o != correct] or "ABCD")
+        if q_type == "MSQ":
+            return ";".join(sorted(rng.sample("ABCD", rng.randint(1, 3))))
+        return str(rng.choice((rng.randint(0, 100), round(rng.uniform(0, 10), 2))))
+
+    def admit(self, tokens):
+        # None if the request is within the limits, else the seconds until it would be
+        now = time.monotonic()
+        with self.lock:
+            self.stats["requests"] += 1
+            while self.window and now - self.window[0][0] >= 60:
+                self.window.popleft()
+            rpm, tpm = self.options["rpm"], self.options["tpm"]
+            used = sum(t for _, t in self.window)
+            if (rpm and len(self.window) >= rpm) or (tpm and used + tokens > tpm):
+                self.stats["throttled"] += 1
+                return max(0.001, 60 - (now - self.window[0][0])) if self.window else 1.0
+            self.window.append((now, tokens))
+            if self.options["error_rate"] and self.errors.random() < self.options["error_rate"]:
+                self.stats["errors"] += 1
+                return 0
+        return None
+
+    def rate_headers(self):
+        with self.lock:
+            now = time.monotonic()
+            reset = 60 - (now - self.window[0][0]) if self.window else 0
+            headers = {}
+            if self.options["rpm"]:
+                headers.update({"x-ratelimit-limit-requests": str(self.options["rpm"]),
+                                "x-ratelimit-remaining-requests": str(max(0, self.options["rpm"] - len(self.window))),
+                                "x-ratelimit-reset-requests": f"{reset:.3f}s"})
+            if self.options["tpm"]:
+                headers.update({"x-ratelimit-limit-tokens": str(self.options["tpm"]),
+                                "x-ratelimit-remaining-tokens": str(max(0, self.options["tpm"] - sum(t for _, t in self.window))),
+                                "x-ratelimit-reset-tokens": f"{reset:.3f}s"})
+            return headers
+
+    def serve_time(self, replies, rng):
+        o = self.options
+        tokens = max(len(reply.split()) for reply in replies)
+        return o["latency"] * (1 + o["batch_overhead"] * (len(replies) - 1)) + o["jitter"] * rng.random() + o["token_latency"] * tokens
+
+    def record(self, prompts, replies):
+        with self.lock:
+            self.stats["prompts"] += len(prompts)
+            self.stats["prompt_tokens"] += sum(count_tokens(p) for p in prompts)
+            self.stats["completion_tokens"] += sum(count_tokens(r) for r in replies)
+
+
+def count_tokens(text):
+    return len(text) // 4 + 1
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    model = None  # MockModel, set on the handler class of each server
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self.send_json(200, {"object": "list", "data": [{"id": self.model.options["model"], "object": "model", "owned_by": "mock"}]})
+        elif self.path.rstrip("/") == "/stats":
+            with self.model.lock:
+                self.send_json(200, dict(self.model.stats))
+        else:
+            self.send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "not_found"}})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        path = self.path.rstrip("/")
+        if path.endswith("/chat/completions"):
+            prompts = ["\n\n".join(str(m.get("content", "")) for m in body.get("messages", []))]
+        elif path.endswith("/completions"):
+            prompts = body.get("prompt", "")
+            prompts = prompts if isinstance(prompts, list) else [prompts]
+        else:
+            self.send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "not_found"}})
+            return
+
+        blocked = self.model.admit(sum(count_tokens(p) + body.get("max_tokens", 16) for p in prompts))
+        if blocked == 0:
+            self.send_json(503, {"error": {"message": "The server is overloaded", "type": "server_error"}})
+            return
+        if blocked:
+            self.send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                           dict(self.model.rate_headers(), **{"retry-after-ms": str(int(blocked * 1000))}))
+            return
+
+        temperature = body.get("temperature") or 0
+        replies = [self.model.answer(p, temperature) for p in prompts]
+        with self.model.slots:
+            rng = self.model.rng(prompts[0], 0)
+            if path.endswith("/chat/completions") and body.get("stream"):
+                self.stream(body, prompts[0], replies[0], rng)
+            else:
+                time.sleep(self.model.serve_time(replies, rng))
+                self.model.record(prompts, replies)
+                self.send_json(200, self.completion(body, path, prompts, replies), self.model.rate_headers())
+
+    def completion(self, body, path, prompts, replies):
+        usage = {"prompt_tokens": sum(count_tokens(p) for p in prompts),
+                 "completion_tokens": sum(count_tokens(r) for r in replies),
+                 "prompt_tokens_details": {"cached_tokens": 0}}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        if path.endswith("/chat/completions"):
+            choices = [{"index": 0, "message": {"role": "assistant", "content": replies[0]}, "finish_reason": "stop"}]
+            kind = "chat.completion"
+        else:
+            choices = [{"index": n, "text": reply, "finish_reason": "stop"} for n, reply in enumerate(replies)]
+            kind = "text_completion"
+        return {"id": f"mock-{hashlib.sha256(''.join(prompts).encode()).hexdigest()[:12]}", "object": kind, "created": int(time.time()),
+                "model": body.get("model", self.model.options["model"]), "choices": choices, "usage": usage}
+
+    def stream(self, body, prompt, reply, rng):
+        # Server-sent events, one word per chunk; a client closing the stream ends the generation
+        o = self.model.options
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        for name, value in self.model.rate_headers().items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.close_connection = True
+        base = {"id": "mock-stream", "object": "chat.completion.chunk", "created": int(time.time()), "model": body.get("model", o["model"])}
+        time.sleep(o["latency"] + o["jitter"] * rng.random())
+        try:
+            for word in re.findall(r"\S+\s*", reply):
+                chunk = dict(base, choices=[{"index": 0, "delta": {"content": word}, "finish_reason": None}])
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(o["token_latency"])
+            final = dict(base, choices=[])
+            if (body.get("stream_options") or {}).get("include_usage"):
+                final["usage"] = {"prompt_tokens": count_tokens(prompt), "completion_tokens": count_tokens(reply), "total_tokens": count_tokens(prompt) + count_tokens(reply)}
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.model.record([prompt], [reply])
+
+
+def start_mock_server(host="127.0.0.1", port=0, **options):
+    # Serve in a background thread; returns the server and its base URL (port 0: any free port)
+    handler = type("MockHandler", (Handler,), {"model": MockModel(**options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deterministic OpenAI-compatible mock model server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    for name, default in DEFAULTS.items():
+        kind = type(default) if default is not None else str
+        parser.add_argument(f"--{name.replace('_', '-')}", type=kind, default=default)
+    options = vars(parser.parse_args())
+    host, port = options.pop("host"), options.pop("port")
+
+    server, url = start_mock_server(host, port, **options)
+    print(f"Mock model server at {url} (MLC_LOCAL_BASE_URL={url})", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
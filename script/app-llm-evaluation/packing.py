@@ -0,0 +1,86 @@
+import re
+import json
+from prompts import PREAMBLE, Prompt, prefix_cache_key
+
+# How each question type is to be answered in a packed prompt
+PACKED_INSTRUCTIONS = {
+    "MCQ": 'multiple choice, exactly one correct option. Answer with the option letter, e.g. "B"',
+    "MSQ": 'multiple select, one or more correct options. Answer with the letters separated by semicolons, e.g. "A;C"',
+    "NAT": 'numerical answer. Answer with only the number, rounded to 1 or 2 decimal places if needed, e.g. "4" or "1.8"',
+}
+FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+# System prefix shared by every packed request
+PACKED_SYSTEM = f"""{PREAMBLE}
+
+You are given several numbered questions. Answer each of them based on your deep subject knowledge. Solve every question carefully and independently. Do not give explanation, just the final answers.
+
+Respond with **only** a JSON object mapping every question number to its answer.
+Do **not** provide any explanation or any text outside the JSON object."""
+PACKED_SYSTEM_MESSAGE = {"role": "system", "content": PACKED_SYSTEM}
+PACKED_CACHE_KEY = prefix_cache_key(PACKED_SYSTEM)
+
+
+def build_packed_prompt(questions):
+    # One prompt for several questions of any type; questions are numbered 1..K in the prompt
+    blocks = []
+    for n, q in enumerate(questions, 1):
+        if q["type"] not in PACKED_INSTRUCTIONS:
+            raise ValueError("Invalid question type. Choose from 'MCQ', 'MSQ', or 'NAT'.")
+        block = f"Question {n} ({q['type']}: {PACKED_INSTRUCTIONS[q['type']]}):\n{q['question']}"
+        if q["type"] != "NAT" and q.get("options"):
+            block += "\nOptions:\n" + "\n".join(f"{k}. {v}" for k, v in q["options"].items())
+        blocks.append(block)
+    example = ", ".join(f'"{n}": "..."' for n in range(1, len(questions) + 1))
+    questions_text = "\n\n".join(blocks)
+    return Prompt(PACKED_SYSTEM_MESSAGE, f"{questions_text}\n\nAnswer in the form {{{example}}}.", PACKED_CACHE_KEY)
+
+
+def parse_packed_reply(text, count):
+    # {question index (1..count): answer text} from a packed reply; indexes missing from the
+    # reply are left out, and None is returned when the reply is not a JSON object at all
+    text = FENCE_RE.sub("", text.strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        reply = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(reply, dict):
+        return None
+
+    answers = {}
+    for n in range(1, count + 1):
+        value = reply.get(str(n))
+        if isinstance(value, list):
+            value = ";".join(str(v) for v in value)
+        if value is None or isinstance(value, (dict, bool)) or not str(value).strip():
+            continue
+        answers[n] = str(value).strip().upper()
+    return answers
+
+
+def compare_with_baseline(results, baseline_results):
+    # Accuracy and marks of a packed (or self-consistency) run against a plain run of the same
+    # paper, over the questions both runs answered
+    baseline = {r["question_number"]: r for r in baseline_results}
+    common = [r for r in results if r["question_number"] in baseline]
+    if not common:
+        return None
+    correct = sum(1 for r in common if r["is_correct"])
+    baseline_correct = sum(1 for r in common if baseline[r["question_number"]]["is_correct"])
+    marks = sum(r["marks"] for r in common)
+    baseline_marks = sum(baseline[r["question_number"]]["marks"] for r in common)
+    return {
+        "questions": len(common),
+        "accuracy": 100 * correct / len(common),
+        "baseline_accuracy": 100 * baseline_correct / len(common),
+        "accuracy_delta": 100 * (correct - baseline_correct) / len(common),
+        "marks": round(marks, 2),
+        "baseline_marks": round(baseline_marks, 2),
+        "marks_delta": round(marks - baseline_marks, 2),
+        "changed_answers": sum(1 for r in common if r["model_answer"] != baseline[r["question_number"]]["model_answer"]),
+        "gained": sorted(r["question_number"] for r in common if r["is_correct"] and not baseline[r["question_number"]]["is_correct"]),
+        "lost": sorted(r["question_number"] for r in common if not r["is_correct"] and baseline[r["question_number"]]["is_correct"]),
+    }
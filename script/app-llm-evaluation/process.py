@@ -1,25 +1,82 @@
 import os
+import sys
 import json
 import time
+import queue
+import re
+import asyncio
+import hashlib
+import functools
+import threading
+import importlib.util
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib.pyplot as plt
 from urllib.parse import urlparse
 from dotenv import load_dotenv
+from response_cache import ResponseCache, open_response_cache
+from run_journal import RunJournal, journal_path, load_journal
+from results_store import open_results_store
+from scoring import load_scheme, score_answers
+import metrics
+from rate_control import RateLimiter, backoff_delay, classify_error, retry_after
+from packing import build_packed_prompt, compare_with_baseline, parse_packed_reply
+from prompts import PROMPT_VERSION, TEMPLATES, as_prompt
+from answer_recognizer import AnswerRecognizer
+from voting import Vote
 
 load_dotenv()
 
+# Decoding parameters sent to the chat completion APIs (also part of the response cache key)
+DECODING_PARAMS = {"max_tokens": 50, "temperature": 0}
+RESULTS_DIR = os.path.expanduser(os.environ.get('MLC_LLM_RESULTS_DIR', os.path.join(os.path.dirname(os.path.realpath(__file__)), "results")))
+
 def get_model_info(model_type):
-    # """Get model name for display purposes"""
+    # """Get the default model name for a model type"""
     if model_type == "gemini":
         return os.environ.get('MLC_GEMINI_MODEL', 'models/gemini-2.5-flash')
     elif model_type == "openai":
         return os.environ.get('MLC_OPENAI_MODEL', 'gpt-4o')
     elif model_type == "groq":
         return os.environ.get('MLC_GROQ_MODEL', 'llama-3.3-70b-versatile')
+    elif model_type == "local":
+        return os.environ.get('MLC_LOCAL_MODEL', 'local-model')
     else:
         return "unknown"
 
 
-def initialize_model(model_type):
+RATE_LIMIT_KEYS = ("rpm", "tpm", "concurrency")
+
+
+def parse_model_specs(env):
+    # MLC_MODEL_SPECS='gemini:models/gemini-2.5-flash,groq:qwen3-32b,openai' evaluates several
+    # models in one run; a spec without a name uses the default model for that type.
+    # '@key=value' suffixes override that model's rate limits, for example
+    # 'gemini:models/gemini-2.5-pro@rpm=3@concurrency=1'.
+    # Falls back to the single MLC_MODEL_TYPE model. Returns [(type, name, limit overrides)].
+    specs = []
+    for spec in env.get('MLC_MODEL_SPECS', '').split(','):
+        spec, *overrides = spec.strip().split('@')
+        if not spec:
+            continue
+        model_type, _, model_name = spec.partition(':')
+        model_type = model_type.strip().lower()
+        limits = {}
+        for override in overrides:
+            key, _, value = override.partition('=')
+            key = key.strip().lower()
+            if key not in RATE_LIMIT_KEYS or not value.strip():
+                raise ValueError(f"Invalid rate limit override '@{override}' in MLC_MODEL_SPECS. Use @rpm=, @tpm= or @concurrency=.")
+            limits[key] = value.strip()
+        specs.append((model_type, model_name.strip() or get_model_info(model_type), limits))
+
+    if not specs:
+        model_type = env.get('MLC_MODEL_TYPE', 'gemini').lower()
+        specs.append((model_type, get_model_info(model_type), {}))
+    return specs
+
+
+def initialize_model(model_type, model_name=None):
     # Initialize the appropriate model based on type
     if model_type == "gemini":
         import google.generativeai as genai
@@ -30,9 +87,7 @@ def initialize_model(model_type):
         
         genai.configure(api_key=api_key)
 
-        model_name = os.environ.get('MLC_GEMINI_MODEL', 'models/gemini-2.5-flash')
-
-        return genai.GenerativeModel(model_name)
+        return genai.GenerativeModel(model_name or get_model_info(model_type))
     
     elif model_type == "openai":
         from openai import OpenAI
@@ -41,7 +96,8 @@ def initialize_model(model_type):
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY not set in environment or .env file!")
         
-        return OpenAI(api_key=api_key)
+        # Retries are done by ModelEvaluator so every 429 reaches the rate controller
+        return OpenAI(api_key=api_key, max_retries=0)
     
     elif model_type == "groq":
         from groq import Groq
@@ -50,92 +106,248 @@ def initialize_model(model_type):
         if not api_key:
             raise RuntimeError("GROQ_API_KEY not set in environment or .env file!")
         
-        return Groq(api_key=api_key)
+        return Groq(api_key=api_key, max_retries=0)
+
+    elif model_type == "local":
+        from openai import OpenAI
+
+        # Any OpenAI-compatible server (vLLM, llama.cpp, mock_server.py); no key is needed
+        base_url = os.environ.get('MLC_LOCAL_BASE_URL', 'http://127.0.0.1:8000/v1')
+        return OpenAI(base_url=base_url, api_key=os.environ.get('MLC_LOCAL_API_KEY', 'local'), max_retries=0)
     else:
-        raise ValueError("Invalid model type. Choose from 'gemini', 'openai', or 'groq'.")
+        raise ValueError("Invalid model type. Choose from 'gemini', 'openai', 'groq', or 'local'.")
     
 
-def ask_model(question, options_dict, model_type, model_instance, q_type):
-    options_text = "\n".join([f"{k}. {v}" for k, v in options_dict.items()]) if options_dict else ""
+def iter_question_file(path):
+    # Yield question records from a JSONL file (one record per line, read lazily)
+    # or from a JSON array as written by older versions of parse-gate-question
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        if first == "[":
+            f.seek(0)
+            yield from json.load(f)
+            return
 
-    if q_type == "MCQ":
-        prompt = f""""Assume you are an expert in Computer Science and Engineering fundamentals, especially the subjects typically covered in a Bachelor's degree in Computer Science like:
-        Data Structures, Algorithms, Operating Systems, Computer Networks, Databases, Theory of Computation, Digital Logic, Computer Architecture, Compiler Design, Discrete Mathematics, Linear Algebra, Probability, and Genral Aptitude.
+        f.seek(0)
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
 
-        Answer the following question based on your deep subject knowledge. Do not give explanation, just the final answer.
-        Solve the following multiple choice question carefully.
 
-        Question: {question}
+def load_parser_module():
+    # The parse-gate-question script sits next to this one (both files are named process.py)
+    path = os.environ.get('MLC_GATE_PARSER_SCRIPT', os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'parse-gate-question', 'process.py'))
+    spec = importlib.util.spec_from_file_location("parse_gate_question", path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so its functions can be pickled for extraction worker processes
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
 
-        Options:
-        {options_text}
 
-        Choose the **one correct option** among A, B, C, or D.
-        Respond with only the **option letter** (A, B, C, or D). Do **not** provide any explanation."""
-    
-    elif q_type == "MSQ":
-        prompt = f"""Assume you are an expert in Computer Science and Engineering fundamentals, especially the subjects typically covered in a Bachelor's degree in Computer Science like:
-        Data Structures, Algorithms, Operating Systems, Computer Networks, Databases, Theory of Computation, Digital Logic, Computer Architecture, Compiler Design, Discrete Mathematics, Linear Algebra, Probability and Genral Aptitude.
+async def stream_parsed_questions(env, maxsize=8):
+    # Fused pipeline: the parser runs in a background thread and hands questions over through a
+    # bounded queue, so Q1 is being answered while later pages are still being extracted.
+    # The parsed questions are also written to MLC_GATE_OUTPUT_JSON_PATH for later runs.
+    parser = load_parser_module()
+    handoff = queue.Queue(maxsize)
+    finished = object()
 
-        Answer the following question based on your deep subject knowledge. Do not give explanation, just the final answer.
-        Solve the following multiple select question carefully.
+    def produce():
+        output_path = os.path.expanduser(env.get('MLC_GATE_OUTPUT_JSON_PATH', '~/MLC/repos/local/cache/gate-exam-data/output.jsonl'))
+        output_format = env.get('MLC_GATE_OUTPUT_FORMAT', 'jsonl').lower()
 
-        Question: {question}
+        def handed_over():
+            for q in parser.stream_questions(env):
+                handoff.put(q)
+                yield q
 
-        Options:
-        {options_text}
+        try:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with open(output_path, "w", encoding="utf-8") as f:
+                parser.write_questions(handed_over(), f, output_format)
+            handoff.put(finished)
+        except BaseException as e:
+            handoff.put(e)
 
-        Choose **all correct options** from A, B, C, or D. There may be more than one correct answer.
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = await asyncio.to_thread(handoff.get)
+        if item is finished:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
 
-        Respond using **only the letters of correct options**, separated **strictly by semicolons (;)**, and **no spaces**.
-        For example: A;C or B;C;D
-        Do **not** provide any explanation."""
 
-    elif q_type == "NAT":
-        prompt = f"""Assume you are an expert in Computer Science and Engineering fundamentals, especially the subjects typically covered in a Bachelor's degree in Computer Science like:
-        Data Structures, Algorithms, Operating Systems, Computer Networks, Databases, Theory of Computation, Digital Logic, Computer Architecture, Compiler Design, Discrete Mathematics, Linear Algebra, Probability and Genral Aptitude.
+def build_prompt(question, options_dict, q_type):
+    # System prefix shared by every question of the type plus a per-question suffix
+    if q_type not in TEMPLATES:
+        raise ValueError("Invalid question type. Choose from 'MCQ', 'MSQ', or 'NAT'.")
+    return TEMPLATES[q_type].render(question, options_dict)
 
-        Answer the following question based on your deep subject knowledge. Do not give explanation, just the final answer. If the question allows decimals, round the answer to **1 or 2 decimal places** as appropriate.
-        Example: 4 or 1.8 or 23.67
-        Solve the following numerical answer type (NAT) question carefully and confidentally. Do not ask for clarification or provide any explanation.
 
-        Question: {question}
+def question_fingerprint(q, prompt, model_type, model_name, params):
+    # Changes whenever anything that affects the model's answer to the question changes: the
+    # question text, options and type, the prompt template and the model and request settings
+    payload = json.dumps([q["question"], q.get("options"), q["type"], PROMPT_VERSION, prompt.messages(), model_type, model_name, params],
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
 
-        Provide **only the final numeric answer** with **no units and no explanation**."""
 
-    else:
-        raise ValueError("Invalid question type. Choose from 'MCQ', 'MSQ', or 'NAT'.")
-    
+@functools.lru_cache(maxsize=None)
+def gemini_model(model_name, system_instruction):
+    # One Gemini model object per system prefix, created on first use
+    import google.generativeai as genai
+    return genai.GenerativeModel(model_name, system_instruction=system_instruction)
+
+
+def ask_model(question, options_dict, model_type, model_instance, q_type, model_name=None, response_info=None):
+    prompt = build_prompt(question, options_dict, q_type)
+    return query_model(prompt, model_type, model_instance, q_type, model_name, response_info)
+
+
+def query_model(prompt, model_type, model_instance, q_type, model_name=None, response_info=None):
+    answer = call_model(prompt, model_type, model_instance, model_name, response_info)
+    return normalize_answer(answer.strip().upper(), q_type)
+
+
+def call_model(prompt, model_type, model_instance, model_name=None, response_info=None, params=DECODING_PARAMS, stream_type=None):
+    # Raw reply text. `response_info`, if given, receives the prompt/completion/cached token
+    # counts reported by the SDK and the HTTP response headers (for the rate-limit headers).
+    # The system prefix goes in the system message (Gemini: system instruction) so providers
+    # can cache it across questions.
+    # With `stream_type` (a question type) the reply is streamed and the stream is cancelled as
+    # soon as a complete answer of that type has been read; only the answer is returned then.
+    model_name = model_name or get_model_info(model_type)
+    prompt = as_prompt(prompt)
+    response_info = {} if response_info is None else response_info
+    headers = None
+    sent = time.perf_counter()
 
     if model_type == "gemini":
-        response = model_instance.generate_content(prompt)
-        answer = response.text.strip().upper()
+        model = gemini_model(model_name, prompt.system) if prompt.system else model_instance
+        # Gemini keeps its own decoding defaults unless a sampling temperature is asked for
+        config = {"generation_config": {"temperature": params["temperature"]}} if params.get("temperature") != DECODING_PARAMS["temperature"] else {}
+        if stream_type:
+            response = model.generate_content(prompt.user, stream=True, **config)
+            text = read_gemini_stream(response, stream_type, sent, response_info)
+        else:
+            response = model.generate_content(prompt.user, **config)
+            text = response.text
 
-    elif model_type == "openai":
-        response = model_instance.chat.completions.create(
-            model=os.environ.get('MLC_OPENAI_MODEL', 'gpt-4o'),
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=50,
-            temperature=0
+    elif model_type in ("openai", "local"):
+        # prompt_cache_key keeps requests sharing a prefix on the same prompt cache
+        raw = model_instance.chat.completions.with_raw_response.create(
+            model=model_name,
+            messages=prompt.messages(),
+            extra_body={"prompt_cache_key": prompt.cache_key} if prompt.cache_key and model_type == "openai" else None,
+            **({"stream": True, "stream_options": {"include_usage": True}} if stream_type else {}),
+            **params
         )
-        answer = response.choices[0].message.content.strip().upper()
+        headers = raw.headers
+        response = raw.parse()
+        if stream_type:
+            text, response = read_chat_stream(response, stream_type, sent, response_info)
+        else:
+            text = response.choices[0].message.content
 
     elif model_type == "groq":
-        response = model_instance.chat.completions.create(
-            model=os.environ.get('MLC_GROQ_MODEL', 'llama-3.3-70b-versatile'),
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=50,
-            temperature=0
+        raw = model_instance.chat.completions.with_raw_response.create(
+            model=model_name,
+            messages=prompt.messages(),
+            **({"stream": True} if stream_type else {}),
+            **params
         )
-        answer = response.choices[0].message.content.strip().upper()
+        headers = raw.headers
+        response = raw.parse()
+        if stream_type:
+            text, response = read_chat_stream(response, stream_type, sent, response_info)
+        else:
+            text = response.choices[0].message.content
     else:
-        raise ValueError("Invalid model type. Choose from 'gemini', 'openai', or 'groq'.")
+        raise ValueError("Invalid model type. Choose from 'gemini', 'openai', 'groq', or 'local'.")
     
+    response_info["prompt_tokens"], response_info["completion_tokens"], response_info["cached_tokens"] = metrics.read_usage(response, model_type)
+    response_info["headers"] = headers
+    return text
+
+
+def call_batch(prompts, model_type, model_instance, model_name=None, response_info=None, params=DECODING_PARAMS):
+    # Reply texts, in order, for several prompts sent as one /v1/completions request. Local
+    # OpenAI-compatible servers run the prompts of one request as a single batch, which keeps a
+    # CPU or GPU busier than the same prompts sent one by one.
+    if model_type != "local":
+        raise ValueError("Batched requests are only supported by the 'local' model type.")
+    model_name = model_name or get_model_info(model_type)
+    response_info = {} if response_info is None else response_info
+    raw = model_instance.completions.with_raw_response.create(
+        model=model_name,
+        prompt=[f"{as_prompt(prompt)}\n\nAnswer:" for prompt in prompts],
+        **params
+    )
+    response = raw.parse()
+    texts = [""] * len(prompts)
+    for choice in response.choices:
+        texts[choice.index] = choice.text
+    response_info["prompt_tokens"], response_info["completion_tokens"], response_info["cached_tokens"] = metrics.read_usage(response, model_type)
+    response_info["headers"] = raw.headers
+    return texts
+
+
+def read_answer(text, q_type):
+    # Leading answer of a completion that may run on past it
+    text = text.strip().upper()
+    return AnswerRecognizer(q_type).feed(text + "\n") or text
+
+
+def read_stream(chunks, q_type, sent, response_info):
+    # Feed streamed text to an answer recognizer and stop reading once it has an answer
+    recognizer = AnswerRecognizer(q_type)
+    for chunk in chunks:
+        if chunk and "first_token" not in response_info:
+            response_info["first_token"] = time.perf_counter() - sent
+        if recognizer.feed(chunk or ""):
+            response_info["stopped_early"] = True
+            return recognizer.answer
+    return recognizer.text
+
 
+def read_chat_stream(stream, q_type, sent, response_info):
+    # OpenAI/Groq chat completion stream -> (text, object with the usage of the final chunk).
+    # Usage is only reported at the end of the stream, so a cancelled stream has none.
+    final = SimpleNamespace(usage=None)
+
+    def texts():
+        for chunk in stream:
+            usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None)
+            if usage:
+                final.usage = usage
+            if chunk.choices:
+                yield chunk.choices[0].delta.content
+
+    try:
+        return read_stream(texts(), q_type, sent, response_info), final
+    finally:
+        # Closing the response cancels the rest of the generation
+        stream.close()
+
+
+def read_gemini_stream(response, q_type, sent, response_info):
+    # Gemini stream -> text. The SDK has no public way to cancel a stream, so the gRPC call
+    # behind the response iterator is cancelled instead. Transports without one (REST) keep
+    # generating server-side: cutting the stream short then only saves latency, not tokens.
+    try:
+        return read_stream((chunk.text for chunk in response), q_type, sent, response_info)
+    finally:
+        cancel = getattr(getattr(response, "_iterator", None), "cancel", None)
+        if callable(cancel):
+            cancel()
+
+
+def normalize_answer(answer, q_type):
     # Normalize MSQ answers
     if q_type == "MSQ":
         answer = answer.replace(",", ";").replace(" ", "")
@@ -145,23 +357,498 @@ def ask_model(question, options_dict, model_type, model_instance, q_type):
     return answer
 
 
-def get_rate_limits(model_type):
+def get_rate_limits(model_type, model_name=None, overrides=None):
+    # Requests/min, tokens/min and requests kept in flight for each provider
+    model_name = model_name or get_model_info(model_type)
     if model_type == "gemini":
-        if(os.environ.get('MLC_GEMINI_MODEL') == 'models/gemini-2.5-pro'):
-            return {"batch_size":3, "batch_sleep": 60}
+        if(model_name == 'models/gemini-2.5-pro'):
+            limits = {"rpm": 3, "tpm": 125000, "concurrency": 2}
         else:
-            return {"batch_size": 6, "batch_sleep": 30}
-        
+            limits = {"rpm": 12, "tpm": 250000, "concurrency": 4}
+
     elif model_type == "openai":
-        return {"batch_size": 10, "batch_sleep": 60}
-    
+        limits = {"rpm": 10, "tpm": 30000, "concurrency": 5}
+
+    elif model_type == "local":
+        limits = {"rpm": 6000, "tpm": 10000000, "concurrency": 4}
+
+    else:
+        limits = {"rpm": 35, "tpm": 12000, "concurrency": 8}
+
+    # Allow the account limits to be overridden, most specific first: '@rpm=' on the model's
+    # MLC_MODEL_SPECS entry, then MLC_LLM_RPM_<TYPE> for every model of the provider, then
+    # MLC_LLM_RPM for every model in the run
+    overrides = overrides or {}
+    for key in RATE_LIMIT_KEYS:
+        value = os.environ.get(f'MLC_LLM_{key.upper()}') or limits[key]
+        value = overrides.get(key) or os.environ.get(f'MLC_LLM_{key.upper()}_{model_type.upper()}') or value
+        limits[key] = int(value) if key == "concurrency" else float(value)
+    return limits
+
+
+def estimate_tokens(prompt, max_output_tokens=50):
+    # Rough token count (~4 characters per token) used to pace the tokens/min budget; a list
+    # of prompts is a batch
+    if isinstance(prompt, list):
+        return sum(estimate_tokens(p, max_output_tokens) for p in prompt)
+    return len(str(prompt)) // 4 + max_output_tokens
+
+
+class ModelEvaluator:
+    # Answers questions for one model. Keeps up to `concurrency` requests in flight, paced by
+    # the adaptive rate limiter; questions found in `done` (answers recovered from a previous
+    # run's journal) are not re-asked while their fingerprint still matches. Throttled, failed
+    # (5xx) or dropped requests are retried up to `max_retries` times with jittered exponential
+    # backoff. Everything after `cache` is keyword-only.
+    # With `pack_size` > 1, questions are collected into packs answered by a single request;
+    # questions missing from a malformed packed reply are asked again one at a time.
+    # With `batch_size` > 1 (local backend), questions are collected the same way but keep their
+    # own prompts, sent together as one batched completions request.
+    # With `stream`, single-question replies are streamed and cut off once the answer is read.
+    # Answers in `previous` (results of an earlier run by question number) are carried forward
+    # when the question's fingerprint is unchanged.
+    # With `samples` > 1 (self-consistency), each question is sampled at `temperature` up to
+    # `samples` times and the answers are majority-voted (NAT answers within `vote_tolerance`
+    # of each other vote together). Samples are drawn concurrently in waves, and no further
+    # samples are drawn once the leading answer can no longer be overturned.
+    def __init__(self, model_type, model_name, model_instance, rate_limits, cache=None, *, journal=None, done=None, label="", previous=None,
+                 max_retries=5, pack_size=1, stream=False, samples=1, temperature=0.7, vote_tolerance=0.01, batch_size=1):
+        self.model_type = model_type
+        self.model_name = model_name
+        self.model_instance = model_instance
+        self.cache = cache
+        self.journal = journal
+        self.done = done or {}
+        self.label = label
+        self.max_retries = max_retries
+        self.pack_size = pack_size
+        self.batch_size = batch_size
+        self.stream = stream
+        self.previous = previous or {}
+        self.samples = samples
+        self.temperature = temperature
+        self.vote_tolerance = vote_tolerance
+        self.fingerprints = {}
+        self.carried = set()
+        self.resumed = set()
+        self.limiter = RateLimiter(rate_limits["rpm"], rate_limits.get("tpm"), provider=model_type)
+        self.semaphore = asyncio.Semaphore(rate_limits["concurrency"])
+        self.start = time.time()
+        self.finished = self.start
+        # Per-request metrics by question number (questions recovered from the journal have none)
+        self.metrics = {}
+        self.pending = []
+        self.pack_tasks = set()
+        self.closed = False
+        self.flush_scheduled = False
+
+    async def answer(self, q):
+        prompt = build_prompt(q["question"], q["options"], q["type"])
+        # Packed, streamed and voted answers are cached apart from answers to the question asked on its own
+        params = DECODING_PARAMS
+        if self.pack_size > 1:
+            params = dict(params, pack_size=self.pack_size)
+        elif self.batch_size > 1:
+            params = dict(params, batch=True)
+        elif self.stream:
+            params = dict(params, stream=True)
+        if self.samples > 1:
+            params = dict(params, temperature=self.temperature, samples=self.samples, vote_tolerance=self.vote_tolerance)
+        fingerprint = self.fingerprints[q["question_number"]] = question_fingerprint(q, prompt, self.model_type, self.model_name, params)
+
+        done = self.done.get(q["question_number"])
+        if done and done["fingerprint"] == fingerprint:
+            self.resumed.add(q["question_number"])
+            return done["model_answer"]
+        previous = self.previous.get(q["question_number"])
+        if previous and previous.get("fingerprint") == fingerprint:
+            self.carried.add(q["question_number"])
+            # Journaled like a fresh answer, so a crash later in the run can still resume it
+            if self.journal:
+                self.journal.append(q["question_number"], previous["model_answer"], fingerprint)
+            return previous["model_answer"]
+
+        record = self.metrics[q["question_number"]] = metrics.new_record(q["question_number"], q["type"])
+        key = ResponseCache.make_key(self.model_type, self.model_name, prompt.messages(), params) if self.cache else None
+        cached = self.cache.get(key) if self.cache else None
+        if cached is not None:
+            print(f"{self.label}Processing Q{q['question_number']}.. (cached)")
+            record["cached"] = True
+            model_answer = cached
+        else:
+            if self.pack_size > 1 or self.batch_size > 1:
+                model_answer = await self.answer_packed(q, record)
+            else:
+                model_answer = await self.answer_single(q, prompt, record)
+            if self.cache:
+                self.cache.put(key, self.model_type, self.model_name, model_answer)
+
+        if self.journal:
+            self.journal.append(q["question_number"], model_answer, fingerprint)
+        self.finished = time.time()
+        return model_answer
+
+    async def answer_single(self, q, prompt, records):
+        if self.samples > 1:
+            return await self.answer_voted(q, prompt, records)
+        text = await self.query(f"Q{q['question_number']}", prompt, DECODING_PARAMS, records, q["type"] if self.stream else None)
+        return normalize_answer(text.strip().upper(), q["type"])
+
+    async def answer_voted(self, q, prompt, record):
+        # The first wave is the smallest number of samples that can form a majority; each later
+        # wave is the fewest samples that could still give the leader a majority
+        vote = Vote(q["type"], self.vote_tolerance)
+        params = dict(DECODING_PARAMS, temperature=self.temperature)
+        majority = self.samples // 2 + 1
+        wave = majority
+        started = time.perf_counter()
+        while True:
+            texts = await asyncio.gather(*(
+                self.query(f"Q{q['question_number']} (sample {vote.count + n}/{self.samples})", prompt, params, record, q["type"] if self.stream else None)
+                for n in range(1, wave + 1)
+            ))
+            for text in texts:
+                vote.add(normalize_answer(text.strip().upper(), q["type"]))
+            if vote.count >= self.samples or vote.decided(self.samples - vote.count):
+                break
+            wave = min(self.samples - vote.count, majority - vote.leader_count())
+        record["samples"] = vote.count
+        record["agreement"] = round(vote.agreement(), 3)
+        record["vote_time"] = time.perf_counter() - started
+        return vote.winner()
+
+    async def answer_packed(self, q, record):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((q, record, future))
+        if len(self.pending) >= max(self.pack_size, self.batch_size):
+            self.flush()
+        elif self.closed:
+            self.schedule_flush()
+        return await future
+
+    def close(self):
+        # No more questions are coming: send the last, partly filled pack
+        self.closed = True
+        if self.pending:
+            self.schedule_flush()
+
+    def schedule_flush(self):
+        # Deferred so questions dispatched in the same event loop iteration share the pack
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self):
+        self.flush_scheduled = False
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.create_task(self.send_batch(batch) if self.batch_size > 1 else self.send_pack(batch))
+            self.pack_tasks.add(task)
+            task.add_done_callback(self.pack_tasks.discard)
+
+    async def send_pack(self, batch):
+        questions = [q for q, _, _ in batch]
+        records = [record for _, record, _ in batch]
+        for record in records:
+            record["pack_size"] = len(batch)
+        params = dict(DECODING_PARAMS, max_tokens=DECODING_PARAMS["max_tokens"] * len(batch))
+        description = f"Q{questions[0]['question_number']}-Q{questions[-1]['question_number']} (packed)"
+        try:
+            text = await self.query(description, build_packed_prompt(questions), params, records)
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        answers = parse_packed_reply(text, len(batch)) or {}
+        if len(answers) < len(batch):
+            print(f"{self.label}{description}: {len(batch) - len(answers)} answers missing from the reply, asking them one at a time")
+
+        async def resolve(n, q, record, future):
+            try:
+                if n in answers:
+                    future.set_result(normalize_answer(answers[n], q["type"]))
+                else:
+                    record["fallback"] = True
+                    prompt = build_prompt(q["question"], q["options"], q["type"])
+                    future.set_result(await self.answer_single(q, prompt, [record]))
+            except Exception as e:
+                future.set_exception(e)
+
+        await asyncio.gather(*(resolve(n, q, record, future) for n, (q, record, future) in enumerate(batch, 1)))
+
+    async def send_batch(self, batch):
+        records = [record for _, record, _ in batch]
+        for record in records:
+            record["pack_size"] = len(batch)
+        prompts = [build_prompt(q["question"], q["options"], q["type"]) for q, _, _ in batch]
+        description = f"Q{batch[0][0]['question_number']}-Q{batch[-1][0]['question_number']} (batch)"
+        try:
+            texts = await self.query(description, prompts, DECODING_PARAMS, records)
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (q, _, future), text in zip(batch, texts):
+            future.set_result(normalize_answer(read_answer(text, q["type"]), q["type"]))
+
+    async def query(self, description, prompt, params, records, stream_type=None):
+        # Sends one request and returns the reply text. The request's timings are added to the
+        # metrics record of every question it carries, and its tokens shared between them.
+        # Model calls have no side effects, so any retryable failure is simply sent again.
+        records = records if isinstance(records, list) else [records]
+
+        def add(field, value):
+            for record in records:
+                record[field] += value
+
+        for attempt in range(self.max_retries + 1):
+            queued = time.perf_counter()
+            async with self.semaphore:
+                add("slot_wait", time.perf_counter() - queued)
+                add("limiter_wait", await self.limiter.acquire(estimate_tokens(prompt, params["max_tokens"])))
+                print(f"{self.label}Processing {description}..")
+                sent = time.perf_counter()
+                response_info = {}
+                try:
+                    if isinstance(prompt, list):
+                        text = await asyncio.to_thread(call_batch, prompt, self.model_type, self.model_instance, self.model_name, response_info, params)
+                    else:
+                        text = await asyncio.to_thread(call_model, prompt, self.model_type, self.model_instance, self.model_name, response_info, params, stream_type)
+                except Exception as e:
+                    add("latency", time.perf_counter() - sent)
+                    retryable, throttled = classify_error(e)
+                    for record in records:
+                        record["errors"].append(type(e).__name__)
+                    if not retryable or attempt == self.max_retries:
+                        for record in records:
+                            record["error"] = type(e).__name__
+                        raise
+                    failure, suggested = e, retry_after(e)
+                    if throttled:
+                        self.limiter.on_throttle(suggested)
+                else:
+                    add("latency", time.perf_counter() - sent)
+                    for record in records:
+                        record["first_token"] = response_info.get("first_token")
+                        record["stopped_early"] = response_info.get("stopped_early", False)
+                    for field in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+                        if response_info[field] is not None:
+                            for record in records:
+                                record[field] = (record[field] or 0) + response_info[field] / len(records)
+                    self.limiter.on_success(response_info["headers"])
+                    return text
+
+            # Back off outside the semaphore so other questions can use the slot
+            delay = backoff_delay(attempt, suggested)
+            add("retries", 1)
+            add("backoff", delay)
+            print(f"{self.label}{description}: {type(failure).__name__}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+            await asyncio.sleep(delay)
+
+
+# Fields kept per question once it has been dispatched; the question text is dropped
+SCORING_FIELDS = ("question_number", "type", "marks", "answer")
+
+
+async def evaluate_questions(questions, evaluators, window):
+    # Questions (an iterable or async iterable) are consumed lazily and dispatched to every
+    # evaluator as they are read. At most `window` questions are in progress (it must hold at
+    # least one full pack per evaluator), so requests start before the whole input has been
+    # read. Returns the slimmed questions and, per evaluator, the answers in question order.
+    slots = asyncio.Semaphore(window)
+
+    async def dispatch(q):
+        try:
+            return await asyncio.gather(*(evaluator.answer(q) for evaluator in evaluators))
+        finally:
+            slots.release()
+
+    dispatched = []
+    tasks = []
+
+    async def submit(q):
+        await slots.acquire()
+        tasks.append(asyncio.create_task(dispatch(q)))
+        dispatched.append({field: q.get(field) for field in SCORING_FIELDS})
+        # Let the new task send its request before the next question is read
+        await asyncio.sleep(0)
+
+    if hasattr(questions, "__aiter__"):
+        async for q in questions:
+            await submit(q)
     else:
-        return {"batch_size": 35, "batch_sleep": 60}
+        for q in questions:
+            await submit(q)
+    for evaluator in evaluators:
+        evaluator.close()
+
+    answers = await asyncio.gather(*tasks)
+    return dispatched, [list(column) for column in zip(*answers)] if answers else [[] for _ in evaluators]
 
 
 def modelProcess(i):
     env = i['env']
-    marks = 0
+    process_start = time.time()
+
+    # One run per model spec; every model shares the parsed questions and the response cache
+    specs = parse_model_specs(env)
+    cache = open_response_cache(env)
+    filename = env.get('MLC_GATE_QUESTION_PDF_URL', 'https://github.com/user-attachments/files/20423322/CS25set2-questionPaper.pdf').split("/")[-1]
+
+    # Every answer is journaled as it completes so an interrupted run can be resumed
+    resume = env.get('MLC_LLM_RESUME', 'no').lower() in ('yes', 'true', '1', 'on')
+    journal_dir = env.get('MLC_LLM_JOURNAL_DIR', '~/MLC/repos/local/cache/gate-exam-data/journal')
+    # Incremental mode only re-asks questions whose fingerprint differs from the previous results
+    incremental = env.get('MLC_LLM_INCREMENTAL', 'no').lower() in ('yes', 'true', '1', 'on')
+
+    runs = []
+    for model_type, model_name, limit_overrides in specs:
+        runs.append({
+            "type": model_type,
+            "name": model_name,
+            "instance": initialize_model(model_type, model_name),
+            "rate_limits": get_rate_limits(model_type, model_name, limit_overrides),
+            "label": f"[{model_name}] " if len(specs) > 1 else "",
+            **run_settings(env, model_type),
+        })
+        run = runs[-1]
+        run["journal_file"] = journal_path(journal_dir, model_name, filename, journal_mode(run_model_info(run)))
+        run["done"] = load_journal(run["journal_file"]) if resume else {}
+        run["previous"] = load_previous_results(results_file(RESULTS_DIR, run_model_info(run))) if incremental else {}
+
+    print("********************************************************************************************************************************")
+    for run in runs:
+        rate_limits = run["rate_limits"]
+        print(f"Model type: {run['type']}")
+        print(f"Model name: {run['name']}")
+        print(f"Rate limits: {rate_limits['rpm']:g} requests/min, {rate_limits['tpm']:g} tokens/min, {rate_limits['concurrency']} in flight")
+        if run["pack_size"] > 1:
+            print(f"Packed mode: {run['pack_size']} questions per request")
+        elif run["batch_size"] > 1:
+            print(f"Batched mode: up to {run['batch_size']} prompts per completions request to {env.get('MLC_LOCAL_BASE_URL', 'http://127.0.0.1:8000/v1')}")
+        elif run["stream"]:
+            print("Streaming mode: replies are cut off once a complete answer has been read")
+        if run["samples"] > 1:
+            print(f"Self-consistency: up to {run['samples']} samples per question at temperature {run['temperature']:g}, majority vote")
+        if incremental:
+            print(f"Incremental: {len(run['previous'])} fingerprinted answers in {results_file(RESULTS_DIR, run_model_info(run))}")
+        if resume:
+            print(f"Resuming from {run['journal_file']}: {len(run['done'])} journaled answers (re-asked if the question or settings changed)")
+        else:
+            print(f"Journal: {run['journal_file']}")
+    print(f"Question url: {env.get('MLC_GATE_QUESTION_PDF_URL', 'https://github.com/user-attachments/files/20423322/CS25set2-questionPaper.pdf')}")
+
+    # Questions are read lazily (JSON or JSONL) while the first requests are already in flight.
+    # In pipeline mode they come straight from the parser instead of the parse step's output file.
+    if env.get('MLC_LLM_PIPELINE', 'no').lower() in ('yes', 'true', '1', 'on'):
+        print("Pipeline mode: parsing the question paper while the model answers")
+        questions = stream_parsed_questions(env)
+    else:
+        questions_file = os.path.expanduser(env.get('MLC_GATE_OUTPUT_JSON_PATH', '~/MLC/repos/local/cache/gate-exam-data/output.jsonl'))
+        questions = iter_question_file(questions_file)
+
+    print("------------------------------------------------------------------------------------------------------------------------------------")
+    for run in runs:
+        run["journal"] = RunJournal(run["journal_file"], resume=resume)
+    try:
+        questions = asyncio.run(evaluate_models(runs, questions, cache))
+    finally:
+        for run in runs:
+            run["journal"].close()
+        if cache:
+            print(f"Response cache: {cache.hits} hits, {cache.misses} misses ({cache.mode}, {cache.path})")
+            cache.close()
+    print("------------------------------------------------------------------------------------------------------------------------------------")
+
+    if incremental:
+        current = {q["question_number"] for q in questions}
+        for run in runs:
+            removed = len(set(run["previous"]) - current)
+            print(f"{run['label']}Incremental: {len(run['carried'])} unchanged questions carried forward, "
+                  f"{len(questions) - len(run['carried'])} re-queried, {removed} no longer in the paper")
+    if resume:
+        for run in runs:
+            print(f"{run['label']}Resumed: {len(run['resumed'])} answers taken from the journal, {len(questions) - len(run['resumed'])} asked")
+
+    # Carried-forward answers are re-scored with the rest against the current answer key
+    scheme = load_scheme(env.get('MLC_LLM_MARKING_SCHEME'))
+    for run in runs:
+        run["output"] = report_run(run, questions, filename, scheme)
+
+    i['state']['runs'] = [{'model_info': run_model_info(run), 'output': run['output'], 'metrics': run['metrics']} for run in runs]
+    i['state']['output'] = runs[0]['output']
+    i['state']['model_info'] = run_model_info(runs[0])
+
+    if len(runs) > 1:
+        print(f"Evaluated {len(runs)} models in {time.time() - process_start:.2f} seconds")
+    return {'return': 0}
+
+
+# Request scheduling settings of a run, passed to ModelEvaluator as keywords
+RUN_SETTINGS = ("max_retries", "pack_size", "stream", "samples", "temperature", "vote_tolerance", "batch_size")
+
+
+def run_settings(env, model_type):
+    # RUN_SETTINGS of a run, from the environment
+    settings = {
+        "max_retries": int(env.get('MLC_LLM_MAX_RETRIES', 5)),
+        "pack_size": max(1, int(env.get('MLC_LLM_PACK_SIZE', 1))),
+        "stream": env.get('MLC_LLM_STREAM', 'no').lower() in ('yes', 'true', '1', 'on'),
+        "samples": max(1, int(env.get('MLC_LLM_SAMPLES', 1))),
+        "temperature": float(env.get('MLC_LLM_SAMPLE_TEMPERATURE', 0.7)),
+        "vote_tolerance": float(env.get('MLC_LLM_VOTE_TOLERANCE', 0.01)),
+        "batch_size": max(1, int(env.get('MLC_LLM_BATCH_SIZE', 1))) if model_type == "local" else 1,
+    }
+    if settings["samples"] > 1 and settings["pack_size"] > 1:
+        raise ValueError("MLC_LLM_SAMPLES cannot be combined with MLC_LLM_PACK_SIZE: packed requests are not sampled")
+    if settings["batch_size"] > 1 and (settings["pack_size"] > 1 or settings["samples"] > 1):
+        raise ValueError("MLC_LLM_BATCH_SIZE cannot be combined with MLC_LLM_PACK_SIZE or MLC_LLM_SAMPLES")
+    return settings
+
+
+def run_model_info(run):
+    # Stream, batch size and temperature are always recorded: results files of plain, streamed
+    # and batched runs share a name, and only these tell them apart for baseline comparisons
+    model_info = {'type': run['type'], 'name': run['name']}
+    if run['pack_size'] > 1:
+        model_info['pack_size'] = run['pack_size']
+    if run.get('samples', 1) > 1:
+        model_info['samples'] = run['samples']
+    model_info['stream'] = bool(run.get('stream')) and run['pack_size'] == 1 and run.get('batch_size', 1) == 1
+    model_info['batch_size'] = run.get('batch_size', 1)
+    model_info['temperature'] = run['temperature'] if run.get('samples', 1) > 1 else DECODING_PARAMS['temperature']
+    return model_info
+
+
+async def evaluate_models(runs, questions, cache):
+    # Drive all models concurrently, each with its own rate limiter and journal
+    workers = sum(run["rate_limits"]["concurrency"] for run in runs)
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=workers + 4))
+
+    evaluators = [
+        ModelEvaluator(run["type"], run["name"], run["instance"], run["rate_limits"], cache,
+                       journal=run["journal"], done=run["done"], label=run["label"], previous=run["previous"],
+                       **{key: run[key] for key in RUN_SETTINGS})
+        for run in runs
+    ]
+    pack_size = max(max(run["pack_size"], run["batch_size"]) for run in runs)
+    dispatched, answers = await evaluate_questions(questions, evaluators, window=2 * workers * pack_size)
+    for run, evaluator, model_answers in zip(runs, evaluators, answers):
+        run["answers"] = model_answers
+        run["wait_time"] = evaluator.limiter.wait_time
+        run["throttled"] = evaluator.limiter.throttled
+        run["final_rpm"] = evaluator.limiter.requests.capacity
+        run["elapsed"] = evaluator.finished - evaluator.start
+        run["metrics"] = [evaluator.metrics[q["question_number"]] for q in dispatched if q["question_number"] in evaluator.metrics]
+        run["fingerprints"] = evaluator.fingerprints
+        run["carried"] = evaluator.carried
+        run["resumed"] = evaluator.resumed
+    return dispatched
+
+
+def report_run(run, questions, filename, scheme=None):
+    # Score a model's answers in question order, print the per-question report and summary
     marksObtained = 0
     negativeMarks = 0
     mcqCorrect = 0
@@ -171,88 +858,33 @@ def modelProcess(i):
     natCorrect = 0
     natWrong = 0
     totalMarks = 0
-    total_sleep_time = 0
-    process_start = time.time()
-    
-    # Determine model type from environment variable
-    model_type = env.get('MLC_MODEL_TYPE', 'gemini').lower()
-    
-    # Initialize the appropriate model
-    model_instance = initialize_model(model_type)
-    model_name = get_model_info(model_type)
-    rate_limits = get_rate_limits(model_type)
-    
-    print("********************************************************************************************************************************")
-    print(f"Model type: {model_type}")
-    print(f"Model name: {model_name}")
-    print(f"Question url: {env.get('MLC_GATE_QUESTION_PDF_URL', 'https://github.com/user-attachments/files/20423322/CS25set2-questionPaper.pdf')}")
-
-    # Load questions
-    questions_file = os.path.expanduser(env.get('MLC_GATE_OUTPUT_JSON_PATH', '~/MLC/repos/local/cache/gate-exam-data/output.json'))
-    with open(os.path.expanduser(questions_file), 'r') as f:
-       questions = json.load(f)
+    model_name = run["name"]
 
+    # Scoring is done for the whole run at once by the scoring engine
     results = []
-    cnt = 0
-    print("------------------------------------------------------------------------------------------------------------------------------------")
-    
-    for q in questions:
-        print(f"Processing Q{q['question_number']}..")
-        
-        model_answer = ask_model(q["question"], q["options"], model_type, model_instance, q["type"])
-        
-        if isinstance(q["answer"], list):
-            correct_answer = ";".join([ans.strip().upper() for ans in q["answer"]])  # Join MSQ answers with ';'
-        else:
-            correct_answer = q["answer"].strip().upper()  # Handle MCQ/NAT answers
-
-        # Evaluate Model's Answer
-        if q["type"] == "NAT" and isinstance(q["answer"], str) and "TO" in q["answer"].upper():
-            # Handle NAT range answers like "0.5 TO 0.6"
-            try:
-                a, b = [float(x.strip()) for x in q["answer"].upper().split("TO")]
-                try:
-                    model_ans_float = float(model_answer)
-                    is_correct = a <= model_ans_float <= b
-                except ValueError:
-                    print(f"Model answer '{model_answer}' could not be converted to float.")
-                    is_correct = False
-            except Exception as e:
-                print(f"Error parsing NAT range: {e}")
-                is_correct = False
-        else:
-            is_correct = model_answer == correct_answer
-
-        # Marks calculation
+    request_metrics = {r["question_number"]: r for r in run.get("metrics", [])}
+    scores = score_answers(questions, run["answers"], scheme)
+    for q, model_answer, (correct_answer, is_correct, marks) in zip(questions, run["answers"], scores):
         totalMarks += q.get("marks", 0)
+        marksObtained += marks
         if is_correct:
-            marks = q.get("marks", 0)
             if q["type"] == "MCQ":
                 mcqCorrect += 1
             if q["type"] == "MSQ":
                 msqCorrect += 1
             if q["type"] == "NAT":
-                natCorrect += 1    
+                natCorrect += 1
         else:
             if q["type"] == "MCQ":
                 mcqWrong += 1
-                if q.get("marks", 0) == 1:
-                    marks = -0.33
-                    negativeMarks += 0.33
-                elif q.get("marks", 0) == 2:
-                    marks = -0.67
-                    negativeMarks += 0.67
+                negativeMarks -= marks
             elif q["type"] == "MSQ":
-                marks = 0
                 msqWrong += 1
             elif q["type"] == "NAT":
-                marks = 0
                 natWrong += 1
-                
-        marksObtained += marks
-        
+
         # Print results        
-        print(f"Q{q['question_number']}: Model: {model_answer}, Correct: {correct_answer} — {'[✓]' if is_correct else '[x]'}")
+        print(f"{run['label']}Q{q['question_number']}: Model: {model_answer}, Correct: {correct_answer} — {'[✓]' if is_correct else '[x]'}")
         print(f"Marks for the question: {q.get('marks', 0)} (Marks received: {marks})")
         print(f"Type: {q['type']}")
         
@@ -264,36 +896,13 @@ def modelProcess(i):
             "type": q["type"],
             "is_correct": is_correct,
             "marks": marks,
+            "max_marks": q.get("marks", 0),
+            "metrics": request_metrics.get(q["question_number"]),
+            "fingerprint": run.get("fingerprints", {}).get(q["question_number"]),
+            "carried_forward": q["question_number"] in run.get("carried", ()),
         })
         
         print("------------------------------------------------------------------------------------------------------------------------------------")
-        cnt += 1
-
-        #for gemini 2.5 pro test
-        # if(cnt == 49):
-        #     if(model_name == 'models/gemini-2.5-pro'):
-        #         print("50 questions completed on gemini 2.5 pro. exiting")
-        #         break
-
-        # Sleep for Rate limit 
-        if cnt % rate_limits["batch_size"] == 0:
-            print(f"Pause of {rate_limits['batch_sleep']} sec due to rate limiting")
-            sleep_start = time.time()
-            for remaining in range(rate_limits["batch_sleep"], 0, -1):
-                print(f"\rResuming in {remaining} seconds...", end="", flush=True)
-                time.sleep(1)
-            sleep_end = time.time()
-            total_sleep_time += (sleep_end - sleep_start)
-            print("Resuming now!")
-            print("********************************************************************************************************************************")
-
-    i['state']['output'] = results
-    i['state']['model_info'] = {'type': model_type, 'name': model_name}
-    
-    process_end = time.time()
-    total_time = process_end - process_start
-    effective_time = total_time - total_sleep_time
-    filename = env.get('MLC_GATE_QUESTION_PDF_URL', 'https://github.com/user-attachments/files/20423322/CS25set2-questionPaper.pdf').split("/")[-1]
 
     # Results summary
     print(f"Result for: {model_name}")
@@ -307,53 +916,195 @@ def modelProcess(i):
     print(f"Negative Marks: {negativeMarks:.2f}")
     print(f"Total Marks Obtained: {marksObtained:.2f}")
     print(f"Total Marks: {totalMarks:.2f}")
-    print(f"Total Time Taken: {total_time:.2f} seconds (Effective Time: {effective_time:.2f} seconds, Sleep Time: {total_sleep_time:.2f} seconds)")
+    print(f"Total Time Taken: {run['elapsed']:.2f} seconds (Rate Limit Wait: {run['wait_time']:.2f} seconds summed over {run['rate_limits']['concurrency']} concurrent requests)")
+    if run.get("throttled"):
+        print(f"Throttled (HTTP 429) {run['throttled']} times; final rate {run['final_rpm']:g} requests/min")
+    print(f"Requests: {metrics.format_summary(metrics.summarize(run.get('metrics', [])))}")
     print("*****************************************************************************************************************************************")
-    return {'return': 0}
+    return results
 
 
-def resultProcess(i):
-    state = i['state']
-    results = state['output']
-    model_info = state.get('model_info', {'type': 'unknown', 'name': 'unknown'})
+def results_mode(model_info):
+    # "_pack<K>" / "_sc<N>" for packed and self-consistency runs, "" for plain runs
+    mode = ""
+    if model_info.get('pack_size', 1) > 1:
+        mode += f"_pack{model_info['pack_size']}"
+    if model_info.get('samples', 1) > 1:
+        mode += f"_sc{model_info['samples']}"
+    return mode
+
+
+def journal_mode(model_info):
+    # Journals are also kept apart for streamed and batched runs, whose replies are read differently
+    mode = results_mode(model_info)
+    if model_info.get('stream'):
+        mode += "_stream"
+    if model_info.get('batch_size', 1) > 1:
+        mode += f"_batch{model_info['batch_size']}"
+    return mode
+
+
+def results_file(results_dir, model_info):
+    # Packed and self-consistency runs are saved next to the plain results of the same model.
+    # Model names such as 'models/gemini-2.5-flash' are flattened so they do not create sub-directories.
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", model_info['name'])
+    return os.path.join(results_dir, f"{name}{results_mode(model_info)}_results.json")
+
+
+def load_previous_results(path):
+    # {question_number: result} of the fingerprinted results in an earlier results file
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return {r["question_number"]: r for r in json.load(f)["results"] if r.get("fingerprint")}
+
+
+def load_baseline(results_dir, model_info):
+    # Results of a plain run of the same model to compare a packed or voted run with: one
+    # question per request, neither streamed nor batched, greedy decoding. Streamed and batched
+    # runs write the same results file, so whichever ran last is checked before it is used.
+    path = results_file(results_dir, {'name': model_info['name']})
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        data = json.load(f)
+    baseline_info = data.get("model_info", {})
+    plain = {'stream': False, 'batch_size': 1, 'temperature': DECODING_PARAMS['temperature']}
+    differing = [key for key, value in plain.items() if baseline_info.get(key) != value]
+    if differing:
+        print(f"Not comparing with {path}: {', '.join(differing)} not recorded or not that of a plain run")
+        return None
+    return data["results"]
 
+
+def save_run_results(results_dir, model_info, results, filename):
     correct = sum(1 for r in results if r['is_correct'])
     wrong = len(results) - correct
     accuracy = 100 * correct / len(results) if results else 0
+    summary = {
+        "model-name": model_info['name'],
+        "question-paper-filename": filename,
+        "correct": correct,
+        "wrong": wrong,
+        "total": len(results),
+        "total_marks": sum(r.get("marks", 0) for r in results),
+        "accuracy": accuracy
+    }
 
-    # Save results in a JSON file
-    results_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "results")
-    os.makedirs(results_dir, exist_ok=True)
-    filename = os.environ.get('MLC_GATE_QUESTION_PDF_URL', 'https://github.com/user-attachments/files/20423322/CS25set2-questionPaper.pdf').split("/")[-1]
-
-    output_file = os.path.join(results_dir, f"{model_info['name']}_results.json")
+    request_metrics = [r["metrics"] for r in results if r.get("metrics")]
 
+    # Packed runs are compared with the unpacked results of the same model
+    output_file = results_file(results_dir, model_info)
+    if model_info.get('pack_size', 1) > 1:
+        baseline_results = load_baseline(results_dir, model_info)
+        if baseline_results is not None:
+            summary["unpacked_baseline"] = compare_with_baseline(results, baseline_results)
+    # Self-consistency runs record their cost per question next to the accuracy gained over
+    # the single-sample results of the same model
+    if model_info.get('samples', 1) > 1:
+        summary["self_consistency"] = {"samples": model_info['samples'], "temperature": model_info.get('temperature'),
+                                       "cost_per_question": metrics.cost_per_question(request_metrics)}
+        baseline_results = load_baseline(results_dir, model_info)
+        if baseline_results is not None:
+            summary["self_consistency"]["single_sample_baseline"] = compare_with_baseline(results, baseline_results)
+            summary["self_consistency"]["baseline_cost_per_question"] = metrics.cost_per_question([r["metrics"] for r in baseline_results if r.get("metrics")])
     with open(output_file, "w") as f:
         json.dump({
             "model_info": model_info,
             "results": results,
-            "summary": {
-                "model-name": model_info['name'],
-                "question-paper-filename": filename,
-                "correct": correct,
-                "wrong": wrong,
-                "total": len(results),
-                "total_marks": sum(r.get("marks", 0) for r in results),
-                "accuracy": accuracy
+            "summary": summary,
+            "metrics": {
+                "overall": metrics.summarize(request_metrics),
+                "by_type": metrics.summarize_by(request_metrics, lambda r: r["type"]),
             },
         }, f, indent=2)
 
     print(f"Results saved to: {output_file}")
     print("*********************************************************************************************************************************")
-    print("Summary of results:")
+    print(f"Summary of results for {model_info['name']}:")
     print("*********************************************************************************************************************************")
     print(f"Correct: {correct}, Wrong: {wrong}, Total: {len(results)}")
     print("---------------------")
     print(f"| Accuracy: {accuracy:.2f}%  |")
     print("---------------------")
+    if summary.get("unpacked_baseline"):
+        delta = summary["unpacked_baseline"]
+        print(f"Packed ({model_info['pack_size']} per request) vs unpacked on {delta['questions']} questions: "
+              f"accuracy {delta['accuracy']:.2f}% vs {delta['baseline_accuracy']:.2f}% ({delta['accuracy_delta']:+.2f}), "
+              f"marks {delta['marks']:g} vs {delta['baseline_marks']:g} ({delta['marks_delta']:+g}), {delta['changed_answers']} answers changed")
+    if summary.get("self_consistency"):
+        sc = summary["self_consistency"]
+        cost = sc["cost_per_question"]
+        if cost:
+            print(f"Self-consistency (up to {sc['samples']} samples): {cost['requests']:.2f} requests, {cost['tokens']:.0f} tokens and {cost['latency']:.2f}s per question")
+        delta, baseline_cost = sc.get("single_sample_baseline"), sc.get("baseline_cost_per_question")
+        if delta:
+            print(f"Voted vs single sample on {delta['questions']} questions: accuracy {delta['accuracy']:.2f}% vs {delta['baseline_accuracy']:.2f}% ({delta['accuracy_delta']:+.2f}), "
+                  f"marks {delta['marks']:g} vs {delta['baseline_marks']:g} ({delta['marks_delta']:+g})"
+                  + (f"; single sample cost {baseline_cost['tokens']:.0f} tokens and {baseline_cost['latency']:.2f}s per question" if baseline_cost else ""))
+    return summary
+
+
+def resultProcess(i):
+    state = i['state']
+    runs = state.get('runs') or [{
+        'model_info': state.get('model_info', {'type': 'unknown', 'name': 'unknown'}),
+        'output': state['output'],
+    }]
+
+    # Save results in a JSON file per model
+    results_dir = RESULTS_DIR
+    os.makedirs(results_dir, exist_ok=True)
+    filename = os.environ.get('MLC_GATE_QUESTION_PDF_URL', 'https://github.com/user-attachments/files/20423322/CS25set2-questionPaper.pdf').split("/")[-1]
+
+    summaries = [save_run_results(results_dir, run['model_info'], run['output'], filename) for run in runs]
+
+    # Every run is also appended to the results store for cross-run queries
+    store = open_results_store(os.environ)
+    if store:
+        run_time = time.time()
+        for run in runs:
+            store.add_run(run['model_info'], run['output'], filename, os.environ.get('GATE_YEAR'), os.environ.get('GATE_SUBJECT'), run_time)
+        print(f"Results appended to: {store.path}")
+        store.close()
+
+    # Request metrics summarized per provider and question type, optionally for Prometheus too
+    metric_runs = [{'model_info': run['model_info'], 'metrics': run.get('metrics', [])} for run in runs]
+    metrics_file = os.path.join(results_dir, f"{os.path.splitext(filename)[0]}_metrics.json")
+    metrics.write_json(metrics_file, metric_runs)
+    print(f"Request metrics saved to: {metrics_file}")
+    if os.environ.get('MLC_LLM_METRICS_PROM'):
+        metrics.write_prometheus(os.path.expanduser(os.environ['MLC_LLM_METRICS_PROM']), metric_runs)
+        print(f"Prometheus metrics written to: {os.environ['MLC_LLM_METRICS_PROM']}")
+
+    if len(runs) == 1:
+        return {'return': 0}
+
+    # Combined comparison across all models evaluated in this run
+    summaries.sort(key=lambda s: s["total_marks"], reverse=True)
+    per_question = {}
+    for run in runs:
+        for r in run['output']:
+            per_question.setdefault(str(r["question_number"]), {})[run['model_info']['name']] = r["is_correct"]
+
+    comparison_file = os.path.join(results_dir, f"{os.path.splitext(filename)[0]}_comparison.json")
+    with open(comparison_file, "w") as f:
+        json.dump({
+            "question-paper-filename": filename,
+            "models": summaries,
+            "per_question": per_question,
+        }, f, indent=2)
+
+    print(f"Comparison saved to: {comparison_file}")
+    print(f"{'Model':<40} {'Marks':>8} {'Accuracy':>10}")
+    for s in summaries:
+        print(f"{s['model-name']:<40} {s['total_marks']:>8.2f} {s['accuracy']:>9.2f}%")
     return {'return': 0}
 
 if __name__ == "__main__":
+    # `process.py --resume` skips questions already answered in the run journal
+    if "--resume" in sys.argv[1:]:
+        os.environ['MLC_LLM_RESUME'] = 'yes'
     i = {'env': os.environ, 'state': {}}
     modelProcess(i)
     resultProcess(i)
\ No newline at end of file
@@ -0,0 +1,97 @@
+import hashlib
+
+# Bumped whenever the wording or layout of the prompts changes.
+# Version 2 (system prefix + per-question user message) changed the version 1 wording:
+#   - the question and options moved out of the instructions into the user message, so
+#     "Answer the following question" became "Answer the question you are given" and
+#     "Solve the following ... question" became "Solve the ... question"
+#   - "Genral Aptitude" -> "General Aptitude", "confidentally" -> "confidently"
+#   - the stray leading '"' of the MCQ prompt, the MCQ-only "Probability, and" comma and the
+#     source-code indentation of every line were dropped
+PROMPT_VERSION = 2
+
+PREAMBLE = """Assume you are an expert in Computer Science and Engineering fundamentals, especially the subjects typically covered in a Bachelor's degree in Computer Science like:
+Data Structures, Algorithms, Operating Systems, Computer Networks, Databases, Theory of Computation, Digital Logic, Computer Architecture, Compiler Design, Discrete Mathematics, Linear Algebra, Probability and General Aptitude."""
+
+# System prefix per question type: everything that does not depend on the question, so the
+# provider sees an identical prefix for every question of that type and can cache it
+TYPE_INSTRUCTIONS = {
+    "MCQ": """Answer the question you are given based on your deep subject knowledge. Do not give explanation, just the final answer.
+Solve the multiple choice question carefully.
+
+Choose the **one correct option** among A, B, C, or D.
+Respond with only the **option letter** (A, B, C, or D). Do **not** provide any explanation.""",
+
+    "MSQ": """Answer the question you are given based on your deep subject knowledge. Do not give explanation, just the final answer.
+Solve the multiple select question carefully.
+
+Choose **all correct options** from A, B, C, or D. There may be more than one correct answer.
+
+Respond using **only the letters of correct options**, separated **strictly by semicolons (;)**, and **no spaces**.
+For example: A;C or B;C;D
+Do **not** provide any explanation.""",
+
+    "NAT": """Answer the question you are given based on your deep subject knowledge. Do not give explanation, just the final answer. If the question allows decimals, round the answer to **1 or 2 decimal places** as appropriate.
+Example: 4 or 1.8 or 23.67
+Solve the numerical answer type (NAT) question carefully and confidently. Do not ask for clarification or provide any explanation.
+
+Provide **only the final numeric answer** with **no units and no explanation**.""",
+}
+
+# Per-question suffix sent as the user message
+QUESTION_TEMPLATES = {
+    "MCQ": "Question: {question}\n\nOptions:\n{options}",
+    "MSQ": "Question: {question}\n\nOptions:\n{options}",
+    "NAT": "Question: {question}",
+}
+
+
+class Prompt:
+    # A stable system message shared by many requests and a short per-question user message.
+    # `cache_key` identifies the system prefix for providers that route on a prompt cache key.
+    __slots__ = ("system_message", "user", "cache_key")
+
+    def __init__(self, system_message, user, cache_key=None):
+        self.system_message = system_message
+        self.user = user
+        self.cache_key = cache_key
+
+    @property
+    def system(self):
+        return self.system_message["content"] if self.system_message else None
+
+    def messages(self):
+        user_message = {"role": "user", "content": self.user}
+        return [self.system_message, user_message] if self.system_message else [user_message]
+
+    def __str__(self):
+        return f"{self.system}\n\n{self.user}" if self.system_message else self.user
+
+
+def as_prompt(prompt):
+    # Plain strings are sent as a single user message
+    return prompt if isinstance(prompt, Prompt) else Prompt(None, prompt)
+
+
+def prefix_cache_key(system):
+    return f"gate-eval-v{PROMPT_VERSION}-{hashlib.sha256(system.encode('utf-8')).hexdigest()[:16]}"
+
+
+class PromptTemplate:
+    # The system message is rendered once; only the question suffix is formatted per question
+    def __init__(self, system, question_template):
+        self.system_message = {"role": "system", "content": system}
+        self.question_template = question_template
+        self.cache_key = prefix_cache_key(system)
+
+    def render(self, question, options=None):
+        options_text = "\n".join(f"{k}. {v}" for k, v in options.items()) if options else ""
+        return Prompt(self.system_message, self.question_template.format(question=question, options=options_text), self.cache_key)
+
+
+def compile_templates():
+    return {q_type: PromptTemplate(f"{PREAMBLE}\n\n{TYPE_INSTRUCTIONS[q_type]}", QUESTION_TEMPLATES[q_type]) for q_type in TYPE_INSTRUCTIONS}
+
+
+# Template registry, one per question type, rendered once per run
+TEMPLATES = compile_templates()
@@ -0,0 +1,177 @@
+import re
+import time
+import random
+import asyncio
+
+# HTTP statuses worth retrying: request timeout, conflict, rate limited and server errors
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+# Window (seconds) of the x-ratelimit-limit-* headers used as rate ceilings: OpenAI reports
+# per-minute limits for both, Groq tokens per minute (its request limit is per day). Local
+# OpenAI-compatible servers that send these headers follow OpenAI.
+HEADER_WINDOWS = {
+    "openai": {"requests": 60, "tokens": 60},
+    "local": {"requests": 60, "tokens": 60},
+    "groq": {"tokens": 60},
+}
+
+
+def parse_duration(text):
+    # "1s", "6m0s", "2m59.56s", "20ms" or plain seconds -> seconds; None if unparsable
+    if text is None:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    parts = DURATION_RE.findall(text)
+    if not parts:
+        return None
+    return sum(float(value) * DURATION_UNITS[unit] for value, unit in parts)
+
+
+def read_rate_headers(headers):
+    # Limit, remaining and reset (seconds) for requests and tokens from x-ratelimit-* headers
+    info = {}
+    for kind in ("requests", "tokens"):
+        limit = headers.get(f"x-ratelimit-limit-{kind}")
+        remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+        info[kind] = {
+            "limit": float(limit) if limit else None,
+            "remaining": float(remaining) if remaining else None,
+            "reset": parse_duration(headers.get(f"x-ratelimit-reset-{kind}")),
+        }
+    return info
+
+
+def error_status(e):
+    # HTTP status of an SDK exception (openai/groq status_code, google api_core code)
+    for attr in ("status_code", "code"):
+        status = getattr(e, attr, None)
+        if isinstance(status, int):
+            return status
+    status = getattr(getattr(e, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after(e):
+    # Server-suggested delay in seconds from Retry-After / retry-after-ms, or None
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    if headers.get("retry-after-ms"):
+        return parse_duration(headers["retry-after-ms"] + "ms")
+    return parse_duration(headers.get("retry-after"))
+
+
+def classify_error(e):
+    # (retryable, throttled) for an exception raised by a model call. Connection errors and
+    # timeouts carry no status and are retried as well.
+    status = error_status(e)
+    if status is None:
+        name = type(e).__name__
+        return ("Connection" in name or "Timeout" in name), False
+    return status in RETRYABLE_STATUS, status == 429
+
+
+def backoff_delay(attempt, suggested=None, base=1.0, cap=60.0):
+    # Full-jitter exponential backoff; never shorter than the server's retry-after hint
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if suggested:
+        delay = suggested + random.uniform(0, base)
+    return delay
+
+
+class TokenBucket:
+    # Refills `per_minute` units every minute and holds at most one minute's worth
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, per_minute):
+        self._refill()
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = min(self.level, per_minute)
+
+    def delay(self, amount):
+        # Seconds until `amount` units are available
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    # Paces requests with one bucket for requests/min and one for tokens/min.
+    # The rates adapt AIMD-style: halved on a 429, raised by a tenth of the ceiling after each
+    # success. The ceiling starts at the configured limits and follows the account limits
+    # reported in x-ratelimit-* headers; an exhausted limit pauses requests until it resets.
+    def __init__(self, rpm, tpm=None, provider=None, decrease=0.5, increase=0.1, floor=0.05):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.ceiling = {"requests": rpm, "tokens": tpm}
+        self.windows = HEADER_WINDOWS.get(provider, {})
+        self.decrease = decrease
+        self.increase = increase
+        self.floor = floor
+        self.blocked_until = 0
+        self.wait_time = 0
+        self.throttled = 0
+        self._lock = asyncio.Lock()
+
+    def buckets(self):
+        return [(kind, bucket) for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)) if bucket]
+
+    async def acquire(self, tokens=0):
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                delay = max(self.requests.delay(1), self.blocked_until - time.monotonic())
+                if self.tokens:
+                    delay = max(delay, self.tokens.delay(tokens))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+        waited = time.monotonic() - start
+        self.wait_time += waited
+        return waited
+
+    def on_success(self, headers=None):
+        # Learn the account limits from the response headers, then ramp back towards them
+        if headers:
+            for kind, info in read_rate_headers(headers).items():
+                if info["limit"] and kind in self.windows and self.ceiling[kind]:
+                    self.ceiling[kind] = info["limit"] * 60 / self.windows[kind]
+                if info["remaining"] == 0 and info["reset"]:
+                    self.pause(info["reset"])
+        for kind, bucket in self.buckets():
+            rate = min(self.ceiling[kind], bucket.capacity + self.ceiling[kind] * self.increase)
+            if rate != bucket.capacity:
+                bucket.set_rate(rate)
+
+    def on_throttle(self, suggested=None):
+        # Multiplicative decrease on a 429, and no requests until the retry-after hint expires
+        self.throttled += 1
+        for kind, bucket in self.buckets():
+            bucket.set_rate(max(self.ceiling[kind] * self.floor, bucket.capacity * self.decrease))
+        if suggested:
+            self.pause(suggested)
+
+    def pause(self, seconds):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
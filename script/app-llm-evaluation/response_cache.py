@@ -0,0 +1,89 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+
+class ResponseCache:
+    # On-disk cache of model answers keyed by a hash of everything that affects the response.
+    # mode: 'on' reads and writes, 'refresh' only writes (re-queries every question)
+    def __init__(self, path, mode="on", max_size_mb=100, max_age_days=30):
+        self.path = os.path.expanduser(path)
+        self.mode = mode
+        self.max_size = int(float(max_size_mb) * 1024 * 1024)
+        self.max_age = float(max_age_days) * 86400
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            model_type TEXT,
+            model_name TEXT,
+            response TEXT,
+            size INTEGER,
+            created_at REAL,
+            accessed_at REAL
+        )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self.conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(model_type, model_name, prompt, params):
+        payload = json.dumps([model_type, model_name, prompt, params], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        if self.mode != "on":
+            return None
+        row = self.conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or (self.max_age and time.time() - row[1] > self.max_age):
+            self.misses += 1
+            return None
+        self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        return row[0]
+
+    def put(self, key, model_type, model_name, response):
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, model_type, model_name, response, len(key) + len(response.encode("utf-8")), now, now),
+        )
+        self.conn.commit()
+
+    def evict(self):
+        # Drop entries older than max_age, then least recently used ones until under max_size
+        if self.max_age:
+            self.conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.max_age,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if self.max_size and total > self.max_size:
+            for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+                if total <= self.max_size:
+                    break
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+        self.conn.commit()
+
+    def close(self):
+        self.evict()
+        self.conn.close()
+
+
+def open_response_cache(env):
+    # Returns None when caching is disabled with MLC_LLM_CACHE=off
+    mode = env.get('MLC_LLM_CACHE', 'on').lower()
+    if mode in ("off", "no", "false", "0"):
+        return None
+    if mode not in ("on", "refresh"):
+        raise ValueError("Invalid MLC_LLM_CACHE value. Choose from 'on', 'off' or 'refresh'.")
+
+    return ResponseCache(
+        env.get('MLC_LLM_CACHE_PATH', '~/MLC/repos/local/cache/gate-exam-data/llm_cache.sqlite'),
+        mode=mode,
+        max_size_mb=env.get('MLC_LLM_CACHE_MAX_MB', 100),
+        max_age_days=env.get('MLC_LLM_CACHE_MAX_AGE_DAYS', 30),
+    )
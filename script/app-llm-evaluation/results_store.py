@@ -0,0 +1,216 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+
+DEFAULT_PATH = '~/MLC/repos/local/cache/gate-exam-data/results.sqlite'
+
+
+class ResultsStore:
+    # Append-only store of evaluation runs: one row per run and one per answered question.
+    # Runs are never updated or replaced, so every earlier run stays queryable.
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_time REAL,
+                model_type TEXT,
+                model_name TEXT,
+                pack_size INTEGER,
+                samples INTEGER DEFAULT 1,
+                paper TEXT,
+                year INTEGER,
+                subject TEXT,
+                questions INTEGER,
+                correct INTEGER,
+                total_marks REAL,
+                max_marks REAL,
+                accuracy REAL
+            );
+            CREATE TABLE IF NOT EXISTS answers (
+                run_id INTEGER REFERENCES runs(id),
+                question_number INTEGER,
+                type TEXT,
+                max_marks REAL,
+                model_answer TEXT,
+                correct_answer TEXT,
+                is_correct INTEGER,
+                marks REAL,
+                latency REAL,
+                limiter_wait REAL,
+                retries INTEGER,
+                prompt_tokens REAL,
+                completion_tokens REAL,
+                error TEXT,
+                PRIMARY KEY (run_id, question_number)
+            );
+            CREATE INDEX IF NOT EXISTS idx_runs_model ON runs(model_name, paper, run_time);
+            CREATE INDEX IF NOT EXISTS idx_runs_paper ON runs(paper, run_time);
+            CREATE INDEX IF NOT EXISTS idx_runs_year ON runs(year, subject);
+            CREATE INDEX IF NOT EXISTS idx_runs_time ON runs(run_time);
+            CREATE INDEX IF NOT EXISTS idx_answers_type ON answers(type, run_id);
+        """)
+        # Stores created before self-consistency runs were recorded have no samples column
+        if "samples" not in [row[1] for row in self.conn.execute("PRAGMA table_info(runs)")]:
+            self.conn.execute("ALTER TABLE runs ADD COLUMN samples INTEGER DEFAULT 1")
+        self.conn.commit()
+
+    def add_run(self, model_info, results, paper, year=None, subject=None, run_time=None):
+        # Store one model's results for one paper; returns the new run id
+        correct = sum(1 for r in results if r["is_correct"])
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (run_time, model_type, model_name, pack_size, samples, paper, year, subject, questions, correct, total_marks, max_marks, accuracy)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_time or time.time(), model_info.get("type"), model_info["name"], model_info.get("pack_size", 1), model_info.get("samples", 1), paper,
+                 int(year) if year else None, subject, len(results), correct,
+                 sum(r.get("marks", 0) for r in results), sum(r.get("max_marks", 0) for r in results),
+                 100 * correct / len(results) if results else 0),
+            )
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO answers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [answer_row(run_id, r) for r in results],
+            )
+        return run_id
+
+    def latest_runs(self, paper=None, year=None, subject=None):
+        # SQL selecting the id of the latest run of every model on every paper, and its parameters
+        where, params = [], []
+        for column, value in (("paper", paper), ("year", year), ("subject", subject)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        condition = f"WHERE {' AND '.join(where)}" if where else ""
+        return (f"SELECT MAX(id) AS id FROM runs {condition} GROUP BY model_name, pack_size, samples, paper", params)
+
+    def leaderboard(self, paper=None, year=None, subject=None, q_type=None):
+        # Latest run of each model, marks and accuracy summed over the selected papers
+        latest, params = self.latest_runs(paper, year, subject)
+        type_condition = "AND a.type = ?" if q_type else ""
+        rows = self.conn.execute(f"""
+            SELECT r.model_name, r.pack_size, r.samples, COUNT(DISTINCT r.paper), COUNT(*), SUM(a.is_correct), SUM(a.marks), SUM(a.max_marks),
+                   AVG(a.latency), MAX(r.run_time)
+            FROM runs r JOIN answers a ON a.run_id = r.id
+            WHERE r.id IN ({latest}) {type_condition}
+            GROUP BY r.model_name, r.pack_size, r.samples
+            ORDER BY SUM(a.marks) DESC
+        """, params + ([q_type] if q_type else [])).fetchall()
+        return [{
+            "model-name": run_label(name, pack_size, samples),
+            "papers": papers,
+            "questions": questions,
+            "correct": int(correct or 0),
+            "total_marks": round(marks or 0, 2),
+            "max_marks": round(max_marks or 0, 2),
+            "accuracy": 100 * (correct or 0) / questions if questions else 0,
+            "mean_latency": latency,
+            "last_run": run_time,
+        } for name, pack_size, samples, papers, questions, correct, marks, max_marks, latency, run_time in rows]
+
+    def difficulty(self, paper=None, year=None, subject=None, q_type=None):
+        # Per question: fraction of models (latest run each) that answered it correctly, hardest first
+        latest, params = self.latest_runs(paper, year, subject)
+        type_condition = "AND a.type = ?" if q_type else ""
+        rows = self.conn.execute(f"""
+            SELECT r.paper, a.question_number, a.type, a.max_marks, COUNT(*), SUM(a.is_correct)
+            FROM runs r JOIN answers a ON a.run_id = r.id
+            WHERE r.id IN ({latest}) {type_condition}
+            GROUP BY r.paper, a.question_number
+            ORDER BY 1.0 * SUM(a.is_correct) / COUNT(*), r.paper, a.question_number
+        """, params + ([q_type] if q_type else [])).fetchall()
+        return [{
+            "paper": paper_name,
+            "question_number": number,
+            "type": q_type_,
+            "max_marks": max_marks,
+            "models": models,
+            "correct": int(correct),
+            "solved_fraction": correct / models,
+        } for paper_name, number, q_type_, max_marks, models, correct in rows]
+
+    def runs(self, model_name=None, paper=None):
+        where, params = [], []
+        if model_name:
+            where.append("model_name = ?")
+            params.append(model_name)
+        if paper:
+            where.append("paper = ?")
+            params.append(paper)
+        condition = f"WHERE {' AND '.join(where)}" if where else ""
+        columns = ("id", "run_time", "model_type", "model_name", "pack_size", "samples", "paper", "year", "subject", "questions", "correct", "total_marks", "max_marks", "accuracy")
+        rows = self.conn.execute(f"SELECT {', '.join(columns)} FROM runs {condition} ORDER BY run_time DESC", params).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+def run_label(name, pack_size=1, samples=1):
+    if pack_size and pack_size > 1:
+        name = f"{name} (packed {pack_size})"
+    if samples and samples > 1:
+        name = f"{name} (voted {samples})"
+    return name
+
+
+def answer_row(run_id, r):
+    # Row of the answers table; questions answered without a request (cached, carried forward
+    # or resumed) have no timings
+    m = r.get("metrics") or {}
+    return (run_id, r["question_number"], r["type"], r.get("max_marks"), r["model_answer"], r["correct_answer"],
+            int(r["is_correct"]), r.get("marks"), m.get("latency"), m.get("limiter_wait"), m.get("retries"),
+            m.get("prompt_tokens"), m.get("completion_tokens"), m.get("error"))
+
+
+def open_results_store(env):
+    # Returns None when the store is disabled with MLC_LLM_RESULTS_DB=off
+    path = env.get('MLC_LLM_RESULTS_DB', DEFAULT_PATH)
+    if path.lower() in ("off", "no", "false", "0"):
+        return None
+    return ResultsStore(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the evaluation results store")
+    parser.add_argument("report", choices=["leaderboard", "difficulty", "runs"])
+    parser.add_argument("--db", default=os.environ.get('MLC_LLM_RESULTS_DB', DEFAULT_PATH), help="results store (SQLite)")
+    parser.add_argument("--paper", help="question paper filename, e.g. CS25set2-questionPaper.pdf")
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--subject")
+    parser.add_argument("--type", choices=["MCQ", "MSQ", "NAT"], help="only questions of this type")
+    parser.add_argument("--model", help="model name (runs report)")
+    parser.add_argument("--limit", type=int, default=20, help="rows shown by the difficulty and runs reports")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.expanduser(args.db)):
+        sys.exit(f"No results store at {args.db}")
+    store = ResultsStore(args.db)
+    if args.report == "leaderboard":
+        rows = store.leaderboard(args.paper, args.year, args.subject, args.type)
+    elif args.report == "difficulty":
+        rows = store.difficulty(args.paper, args.year, args.subject, args.type)[:args.limit]
+    else:
+        rows = store.runs(args.model, args.paper)[:args.limit]
+    store.close()
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    elif args.report == "leaderboard":
+        print(f"{'Model':<40} {'Papers':>6} {'Marks':>8} {'Accuracy':>10}")
+        for row in rows:
+            print(f"{row['model-name']:<40} {row['papers']:>6} {row['total_marks']:>8.2f} {row['accuracy']:>9.2f}%")
+    elif args.report == "difficulty":
+        print(f"{'Paper':<32} {'Q':>4} {'Type':>5} {'Solved':>8}")
+        for row in rows:
+            print(f"{row['paper']:<32} {row['question_number']:>4} {row['type']:>5} {row['correct']:>3}/{row['models']:<4}")
+    else:
+        print(f"{'Run':>5} {'Time':<20} {'Model':<40} {'Paper':<32} {'Marks':>8}")
+        for row in rows:
+            print(f"{row['id']:>5} {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(row['run_time'])):<20} {row['model_name']:<40} {row['paper']:<32} {row['total_marks']:>8.2f}")
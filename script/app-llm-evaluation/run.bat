@@ -23,5 +23,5 @@ if exist "%SCRIPT_DIR%\.env" (
     echo No .env file found in %SCRIPT_DIR%. Skipping environment variable loading.
 )
 
-%MLC_PYTHON_BIN_WITH_PATH% "%SCRIPT_DIR%\process.py"
+%MLC_PYTHON_BIN_WITH_PATH% "%SCRIPT_DIR%\process.py" %*
 if errorlevel 1 exit /b 1
@@ -0,0 +1,60 @@
+import os
+import re
+import json
+import time
+
+
+def journal_path(journal_dir, model_name, paper_filename, mode=""):
+    # One journal per (model, answering mode, question paper) so a resumed run finds its own
+    # answers and never those of a packed, voted, streamed or batched run of the same model
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", f"{model_name}{mode}__{paper_filename}")
+    return os.path.join(os.path.expanduser(journal_dir), f"{name}.jsonl")
+
+
+def load_journal(path):
+    # Returns {question_number: {"model_answer", "fingerprint"}}; a torn last line from a crash
+    # is ignored. Records written before fingerprints were journaled have a None fingerprint.
+    answers = {}
+    if not os.path.exists(path):
+        return answers
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            answers[record["question_number"]] = {"model_answer": record["model_answer"], "fingerprint": record.get("fingerprint")}
+    return answers
+
+
+class RunJournal:
+    # Append-only JSONL log of answers as they complete.
+    # Every record is flushed to the OS immediately; fsync is batched every
+    # `fsync_every` records or `fsync_interval` seconds, and always on close.
+    def __init__(self, path, resume=False, fsync_every=8, fsync_interval=2.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.f = open(path, "a" if resume else "w", encoding="utf-8")
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def append(self, question_number, model_answer, fingerprint=None):
+        record = {"question_number": question_number, "model_answer": model_answer, "fingerprint": fingerprint, "time": time.time()}
+        self.f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.f.flush()
+        self.pending += 1
+        if self.pending >= self.fsync_every or time.monotonic() - self.last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        if self.pending:
+            os.fsync(self.f.fileno())
+            self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        if not self.f.closed:
+            self.sync()
+            self.f.close()
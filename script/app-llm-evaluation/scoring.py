@@ -0,0 +1,234 @@
+import os
+import re
+import sys
+import glob
+import json
+import argparse
+import numpy as np
+
+# GATE marking: full marks for a correct answer, 1/3 of the marks deducted for a wrong MCQ
+# (rounded as on the official key), nothing deducted for MSQ/NAT and no partial credit.
+# Answers are compared as text, except NAT range keys, unless a matching flag is set.
+DEFAULT_SCHEME = {
+    "mcq_negative": {"1": 0.33, "2": 0.67},  # marks deducted for a wrong MCQ, by question marks
+    "mcq_negative_fraction": None,           # if set, deduct this fraction of the marks instead
+    "msq_negative": 0.0,                     # fraction of the marks deducted for a wrong MSQ
+    "msq_partial_credit": False,             # marks * picked/correct when no wrong option is picked
+    "nat_abs_tolerance": 0.0,                # NAT answers within this distance of the key/range count
+    "nat_rel_tolerance": 0.0,                # ... or within this fraction of the key value
+    "option_set_match": False,               # MCQ/MSQ answers match as option sets ("C;A" == "A;C")
+    "nat_numeric_match": False,              # single-value NAT keys match numerically ("4.00" == "4")
+}
+
+TYPE_CODES = {"MCQ": 0, "MSQ": 1, "NAT": 2}
+OPTION_BITS = {"A": 1, "B": 2, "C": 4, "D": 8}
+POPCOUNT = np.array([bin(n).count("1") for n in range(16)])
+OPTIONS_RE = re.compile(r"[A-D](?:;[A-D])*")
+RANGE_RE = re.compile(r"^\s*(\S+?)\s*TO\s*(\S+)\s*$")
+
+
+def load_scheme(path=None):
+    scheme = dict(DEFAULT_SCHEME)
+    if path:
+        with open(os.path.expanduser(path), "r") as f:
+            scheme.update(json.load(f))
+    return scheme
+
+
+def correct_answer_text(answer):
+    # Answer key in the form stored in results files: MSQ options joined with ';', upper case
+    if isinstance(answer, list):
+        return ";".join([ans.strip().upper() for ans in answer])
+    return (answer or "").strip().upper()
+
+
+def option_mask(text):
+    # Bit mask of the options in "A;C" style answers, 0 if the text is not a valid option set
+    if not OPTIONS_RE.fullmatch(text):
+        return 0
+    mask = 0
+    for option in text.split(";"):
+        mask |= OPTION_BITS[option]
+    return mask
+
+
+def to_float(text):
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def key_range(text):
+    # (low, high) of a NAT key: "0.5 TO 0.6" or a single value; NaN when not numeric
+    match = RANGE_RE.match(text)
+    if match:
+        return to_float(match.group(1)), to_float(match.group(2))
+    value = to_float(text)
+    return value, value
+
+
+def build_columns(records):
+    # Column arrays from records with "type", "max_marks", "correct_answer", "model_answer"
+    # and "run" (index of the run the answer belongs to)
+    model_text = [r["model_answer"] or "" for r in records]
+    key_text = [r["correct_answer"] for r in records]
+    ranges = [key_range(text) for text in key_text]
+    return {
+        "run": np.array([r.get("run", 0) for r in records], dtype=np.int64),
+        "type": np.array([TYPE_CODES.get(r["type"], 3) for r in records], dtype=np.int8),
+        "marks": np.array([r["max_marks"] for r in records], dtype=float),
+        "model_mask": np.array([option_mask(text) for text in model_text], dtype=np.int64),
+        "key_mask": np.array([option_mask(text) for text in key_text], dtype=np.int64),
+        "model_value": np.array([to_float(text) for text in model_text], dtype=float),
+        "key_low": np.array([low for low, _ in ranges], dtype=float),
+        "key_high": np.array([high for _, high in ranges], dtype=float),
+        "is_range": np.array([bool(RANGE_RE.match(text)) for text in key_text], dtype=bool),
+        "text_equal": np.array([m == k for m, k in zip(model_text, key_text)], dtype=bool),
+    }
+
+
+def score_columns(cols, scheme=None):
+    # Vectorised marking of every answer at once; returns (is_correct, marks awarded)
+    scheme = scheme or DEFAULT_SCHEME
+    qtype = cols["type"]
+    marks = cols["marks"]
+    is_choice = (qtype == TYPE_CODES["MCQ"]) | (qtype == TYPE_CODES["MSQ"])
+    is_mcq = qtype == TYPE_CODES["MCQ"]
+    is_msq = qtype == TYPE_CODES["MSQ"]
+    is_nat = qtype == TYPE_CODES["NAT"]
+
+    # MCQ/MSQ: the chosen option set must equal the key's option set
+    choice_ok = (cols["model_mask"] != 0) & (cols["model_mask"] == cols["key_mask"])
+    by_option_set = is_choice & (cols["key_mask"] != 0) & bool(scheme.get("option_set_match"))
+
+    # NAT: inside the key range widened by the tolerances. Single-value keys compare as text
+    # unless numeric matching is on (a tolerance turns it on); non-numeric keys always do.
+    low, high, value = cols["key_low"], cols["key_high"], cols["model_value"]
+    tolerance = np.maximum(scheme["nat_abs_tolerance"], scheme["nat_rel_tolerance"] * np.abs(high))
+    with np.errstate(invalid="ignore"):
+        nat_ok = (value >= low - tolerance) & (value <= high + tolerance)
+    numeric = scheme.get("nat_numeric_match") or scheme["nat_abs_tolerance"] or scheme["nat_rel_tolerance"]
+    by_text = np.isnan(low) | np.isnan(high) | (~cols["is_range"] & (not numeric))
+    nat_ok = np.where(by_text, cols["text_equal"], nat_ok)
+
+    is_correct = np.where(by_option_set, choice_ok,
+                          np.where(is_nat, nat_ok, cols["text_equal"]))
+    awarded = np.where(is_correct, marks, 0.0)
+
+    # Negative marking
+    if scheme.get("mcq_negative_fraction") is not None:
+        mcq_penalty = marks * scheme["mcq_negative_fraction"]
+    else:
+        mcq_penalty = np.zeros_like(marks)
+        for question_marks, penalty in scheme["mcq_negative"].items():
+            mcq_penalty[marks == float(question_marks)] = penalty
+    awarded = np.where(is_mcq & ~is_correct, -mcq_penalty, awarded)
+    awarded = np.where(is_msq & ~is_correct, -marks * scheme["msq_negative"], awarded)
+
+    # MSQ partial credit: some correct options picked and no wrong ones
+    if scheme["msq_partial_credit"]:
+        picked = POPCOUNT[cols["model_mask"] & 15]
+        needed = POPCOUNT[cols["key_mask"] & 15]
+        no_wrong = (cols["model_mask"] & ~cols["key_mask"]) == 0
+        partial = is_msq & ~is_correct & (picked > 0) & no_wrong & (needed > 0)
+        awarded = np.where(partial, marks * picked / np.maximum(needed, 1), awarded)
+
+    # Adding 0.0 turns the -0.0 of unpenalised wrong answers into 0.0
+    return is_correct.astype(bool), awarded + 0.0
+
+
+def score_answers(questions, answers, scheme=None):
+    # Score one run: returns [(correct_answer, is_correct, marks)] in question order
+    records = [{
+        "type": q["type"],
+        "max_marks": q.get("marks", 0),
+        "correct_answer": correct_answer_text(q["answer"]),
+        "model_answer": answer,
+    } for q, answer in zip(questions, answers)]
+    if not records:
+        return []
+    is_correct, awarded = score_columns(build_columns(records), scheme)
+    return [(r["correct_answer"], bool(ok), plain_marks(m)) for r, ok, m in zip(records, is_correct, awarded)]
+
+
+def plain_marks(value):
+    # Marks as stored in results files: whole marks as int, otherwise rounded to 2 decimals
+    value = round(float(value), 2)
+    return int(value) if value.is_integer() else value
+
+
+def load_key(path):
+    # {question_number: question} from a parsed paper (JSON array or JSONL)
+    with open(os.path.expanduser(path), "r", encoding="utf-8") as f:
+        text = f.read()
+    questions = json.loads(text) if text.lstrip().startswith("[") else [json.loads(line) for line in text.splitlines() if line.strip()]
+    return {q["question_number"]: q for q in questions}
+
+
+def rescore_files(paths, scheme=None, key=None):
+    # Re-score stored results files in one vectorised pass; returns one summary row per file.
+    # With `key`, answers and marks come from the answer key instead of the stored results.
+    records = []
+    runs = []
+    for run, path in enumerate(paths):
+        with open(path, "r") as f:
+            data = json.load(f)
+        runs.append({"file": path, "model-name": data.get("model_info", {}).get("name", "unknown")})
+        for r in data["results"]:
+            q = key.get(r["question_number"]) if key else None
+            if q is None and "max_marks" not in r:
+                raise ValueError(f"{path}: Q{r['question_number']} has no max_marks; pass the answer key")
+            records.append({
+                "run": run,
+                "type": q["type"] if q else r["type"],
+                "max_marks": q.get("marks", 0) if q else r["max_marks"],
+                "correct_answer": correct_answer_text(q["answer"]) if q else r["correct_answer"],
+                "model_answer": r["model_answer"],
+            })
+
+    if not records:
+        return []
+    cols = build_columns(records)
+    is_correct, awarded = score_columns(cols, scheme)
+
+    n = len(runs)
+    totals = np.bincount(cols["run"], weights=awarded, minlength=n)
+    correct = np.bincount(cols["run"], weights=is_correct, minlength=n)
+    counts = np.bincount(cols["run"], minlength=n)
+    max_marks = np.bincount(cols["run"], weights=cols["marks"], minlength=n)
+    by_type = np.bincount(cols["run"] * 4 + cols["type"], weights=is_correct, minlength=4 * n).reshape(n, 4)
+    for idx, row in enumerate(runs):
+        row.update({
+            "correct": int(correct[idx]),
+            "total": int(counts[idx]),
+            "total_marks": round(float(totals[idx]), 2),
+            "max_marks": float(max_marks[idx]),
+            "accuracy": 100 * float(correct[idx]) / counts[idx] if counts[idx] else 0,
+            "mcq_correct": int(by_type[idx, 0]),
+            "msq_correct": int(by_type[idx, 1]),
+            "nat_correct": int(by_type[idx, 2]),
+        })
+    return runs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score stored evaluation results under a marking scheme")
+    parser.add_argument("results", nargs="*", help="results JSON files (default: results/**/*_results.json)")
+    parser.add_argument("--scheme", help="JSON file overriding keys of the default marking scheme")
+    parser.add_argument("--key", help="parsed paper (output.jsonl) to take answers and marks from")
+    parser.add_argument("--json", action="store_true", help="print the leaderboard as JSON")
+    args = parser.parse_args()
+
+    paths = args.results or sorted(glob.glob(os.path.join(os.path.dirname(os.path.realpath(__file__)), "results", "**", "*_results.json"), recursive=True))
+    if not paths:
+        sys.exit("No results files found")
+
+    rows = rescore_files(paths, load_scheme(args.scheme), load_key(args.key) if args.key else None)
+    rows.sort(key=lambda row: row["total_marks"], reverse=True)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'Model':<40} {'Marks':>8} {'Accuracy':>10}  File")
+        for row in rows:
+            print(f"{row['model-name']:<40} {row['total_marks']:>8.2f} {row['accuracy']:>9.2f}%  {row['file']}")
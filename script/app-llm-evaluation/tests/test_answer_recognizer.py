@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from answer_recognizer import SEARCH_LIMIT, AnswerRecognizer
+
+
+def feed(q_type, *chunks):
+    # The recognizer's result after each chunk
+    recognizer = AnswerRecognizer(q_type)
+    return [recognizer.feed(chunk) for chunk in chunks]
+
+
+def test_answer_needs_the_following_character():
+    assert feed("MCQ", "B", "\n") == [None, "B"]
+    assert feed("MSQ", "A;", "C", "\n") == [None, None, "A;C"]
+    assert feed("NAT", "1", ".8", "\n") == [None, None, "1.8"]
+
+
+def test_decorated_answers():
+    assert feed("MCQ", "**", "B", "**") == [None, None, "B"]
+    assert feed("MCQ", "(c) because") == ["C"]
+    assert feed("NAT", "-3.5 units") == ["-3.5"]
+
+
+def test_replies_that_do_not_start_with_an_answer():
+    # "A" followed by more letters is a word, not option A
+    assert feed("MCQ", "A", "NSWER: C\n") == [None, None]
+    assert feed("NAT", "1,000\n") == [None]
+    assert feed("MCQ", "x" * (SEARCH_LIMIT + 1), "B\n") == [None, None]
+
+
+def test_text_is_kept_after_the_answer():
+    recognizer = AnswerRecognizer("MCQ")
+    recognizer.feed("D\n")
+    recognizer.feed("because ...")
+    assert recognizer.answer == "D" and recognizer.text == "D\nbecause ..."
@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from packing import build_packed_prompt, parse_packed_reply
+
+
+def test_parse_plain_and_fenced_replies():
+    assert parse_packed_reply('{"1": "b", "2": "A;C", "3": 1.8}', 3) == {1: "B", 2: "A;C", 3: "1.8"}
+    assert parse_packed_reply('```json\n{"1": "D", "2": ["A", "C"]}\n```', 2) == {1: "D", 2: "A;C"}
+    assert parse_packed_reply('Here are the answers: {"1": "A"} Good luck!', 1) == {1: "A"}
+
+
+def test_missing_and_unusable_answers_are_left_out():
+    # Left out answers are asked again one question at a time
+    assert parse_packed_reply('{"1": "A", "3": "", "4": null, "5": true, "6": {"x": 1}, "9": "B"}', 6) == {1: "A"}
+
+
+def test_replies_that_are_not_a_json_object():
+    assert parse_packed_reply("A, C, 4", 3) is None
+    assert parse_packed_reply('{"1": "A", "2": ', 2) is None
+    assert parse_packed_reply('["A", "C"]', 2) is None
+
+
+def test_packed_prompt_numbers_questions():
+    prompt = build_packed_prompt([
+        {"type": "MCQ", "question": "Pick one", "options": {"A": "x", "B": "y"}},
+        {"type": "NAT", "question": "Compute", "options": {"A": "ignored"}},
+    ])
+    assert "Question 1 (MCQ" in prompt.user and "Question 2 (NAT" in prompt.user
+    assert "A. x" in prompt.user and "ignored" not in prompt.user
+    assert prompt.user.endswith('{"1": "...", "2": "..."}.')
@@ -0,0 +1,187 @@
+import os
+import sys
+import random
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import rate_control
+from rate_control import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    # Stands in for time.monotonic and asyncio.sleep: sleeping advances the clock at once
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    async def sleep(self, seconds):
+        self.advance(seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_control, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(rate_control, "asyncio", SimpleNamespace(Lock=asyncio.Lock, sleep=clock.sleep))
+    return clock
+
+
+def http_error(status=None, headers=None, name="APIStatusError"):
+    # An SDK-style exception with a status code and response headers
+    error = type(name, (Exception,), {})()
+    if status is not None:
+        error.status_code = status
+    error.response = SimpleNamespace(headers=headers or {})
+    return error
+
+
+def test_parse_duration():
+    assert rate_control.parse_duration("1s") == 1
+    assert rate_control.parse_duration("6m0s") == 360
+    assert rate_control.parse_duration("2m59.56s") == pytest.approx(179.56)
+    assert rate_control.parse_duration("20ms") == pytest.approx(0.02)
+    assert rate_control.parse_duration("7") == 7
+    assert rate_control.parse_duration("soon") is None
+    assert rate_control.parse_duration(None) is None
+
+
+def test_read_rate_headers():
+    info = rate_control.read_rate_headers({
+        "x-ratelimit-limit-requests": "500",
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "1m30s",
+        "x-ratelimit-limit-tokens": "30000",
+    })
+    assert info["requests"] == {"limit": 500, "remaining": 0, "reset": 90}
+    assert info["tokens"] == {"limit": 30000, "remaining": None, "reset": None}
+
+
+def test_retry_after_headers():
+    assert rate_control.retry_after(http_error(429, {"retry-after-ms": "250"})) == pytest.approx(0.25)
+    assert rate_control.retry_after(http_error(429, {"retry-after": "3"})) == 3
+    assert rate_control.retry_after(http_error(429)) is None
+    assert rate_control.retry_after(ValueError()) is None
+
+
+def test_classify_error():
+    assert rate_control.classify_error(http_error(429)) == (True, True)
+    assert rate_control.classify_error(http_error(503)) == (True, False)
+    assert rate_control.classify_error(http_error(400)) == (False, False)
+    assert rate_control.classify_error(http_error(name="APIConnectionError")) == (True, False)
+    assert rate_control.classify_error(http_error(name="ReadTimeout")) == (True, False)
+    assert rate_control.classify_error(ValueError("bad prompt")) == (False, False)
+
+
+def test_backoff_delay_is_capped_and_honours_retry_after():
+    random.seed(3)
+    assert all(0 <= rate_control.backoff_delay(0) <= 1 for _ in range(100))
+    assert all(0 <= rate_control.backoff_delay(3) <= 8 for _ in range(100))
+    assert all(0 <= rate_control.backoff_delay(30) <= 60 for _ in range(100))
+    assert all(5 <= rate_control.backoff_delay(30, suggested=5) <= 6 for _ in range(100))
+
+
+def test_token_bucket_refills_up_to_one_minute(clock):
+    bucket = TokenBucket(60)
+    assert bucket.delay(1) == 0
+    bucket.take(60)
+    assert bucket.delay(1) == pytest.approx(1)
+    clock.advance(0.5)
+    assert bucket.delay(1) == pytest.approx(0.5)
+    clock.advance(3600)
+    assert bucket.delay(60) == 0 and bucket.delay(1000) == 0
+    bucket.take(1000)  # more than capacity takes one minute's worth
+    assert bucket.delay(1) == pytest.approx(1)
+
+
+def test_limiter_aimd(clock):
+    limiter = RateLimiter(60, 6000)
+    limiter.on_throttle()
+    assert limiter.requests.capacity == 30 and limiter.tokens.capacity == 3000
+    limiter.on_throttle()
+    assert limiter.requests.capacity == 15
+    for _ in range(10):
+        limiter.on_throttle()
+    assert limiter.requests.capacity == pytest.approx(3)  # floor: 5% of the ceiling
+    assert limiter.throttled == 12
+
+    limiter.on_success()
+    assert limiter.requests.capacity == pytest.approx(9)  # + a tenth of the ceiling
+    for _ in range(20):
+        limiter.on_success()
+    assert limiter.requests.capacity == 60 and limiter.tokens.capacity == 6000
+
+
+def test_limiter_learns_limits_and_pauses_from_headers(clock):
+    limiter = RateLimiter(60, 6000, provider="openai")
+    limiter.on_success({"x-ratelimit-limit-requests": "120", "x-ratelimit-remaining-requests": "0",
+                        "x-ratelimit-reset-requests": "2s"})
+    assert limiter.ceiling["requests"] == 120
+    assert limiter.requests.capacity == pytest.approx(72)
+    assert limiter.blocked_until == pytest.approx(clock.now + 2)
+
+    # Groq's request limit is per day, so only its token limit is followed
+    groq = RateLimiter(30, 6000, provider="groq")
+    groq.on_success({"x-ratelimit-limit-requests": "14400", "x-ratelimit-limit-tokens": "12000"})
+    assert groq.ceiling == {"requests": 30, "tokens": 12000}
+
+
+def test_acquire_waits_for_the_bucket_and_retry_after(clock):
+    limiter = RateLimiter(60)
+
+    async def acquire(n):
+        return [await limiter.acquire() for _ in range(n)]
+
+    assert asyncio.run(acquire(60)) == [0] * 60
+    assert asyncio.run(acquire(1)) == [pytest.approx(1)]
+
+    limiter.on_throttle(suggested=5)
+    (waited,) = asyncio.run(acquire(1))
+    assert waited >= 5
+    assert limiter.wait_time == pytest.approx(1 + waited)
+
+
+def test_evaluator_retries_throttled_requests(monkeypatch):
+    import process
+
+    failures = [http_error(429, {"retry-after-ms": "10"}), http_error(503)]
+
+    def call_model(prompt, model_type, model_instance, model_name=None, response_info=None, *args, **kwargs):
+        if failures:
+            raise failures.pop(0)
+        response_info.update(prompt_tokens=10, completion_tokens=1, cached_tokens=None, headers=None)
+        return "B"
+
+    monkeypatch.setattr(process, "call_model", call_model)
+    monkeypatch.setattr(process, "backoff_delay", lambda attempt, suggested=None: 0)
+    evaluator = process.ModelEvaluator("local", "test-model", None, {"rpm": 6000, "tpm": None, "concurrency": 1}, max_retries=2)
+    q = {"question_number": 1, "question": "Pick one", "options": {"A": "x", "B": "y"}, "type": "MCQ"}
+    assert asyncio.run(evaluator.answer(q)) == "B"
+
+    record = evaluator.metrics[1]
+    assert record["retries"] == 2 and record["errors"] == ["APIStatusError", "APIStatusError"]
+    assert record["error"] is None and evaluator.limiter.throttled == 1
+
+
+def test_evaluator_gives_up_on_client_errors(monkeypatch):
+    import process
+
+    def call_model(*args, **kwargs):
+        raise http_error(400, name="BadRequestError")
+
+    monkeypatch.setattr(process, "call_model", call_model)
+    evaluator = process.ModelEvaluator("local", "test-model", None, {"rpm": 6000, "tpm": None, "concurrency": 1}, max_retries=5)
+    q = {"question_number": 1, "question": "Pick one", "options": {"A": "x", "B": "y"}, "type": "MCQ"}
+    with pytest.raises(Exception):
+        asyncio.run(evaluator.answer(q))
+
+    record = evaluator.metrics[1]
+    assert record["retries"] == 0 and record["errors"] == ["BadRequestError"] and record["error"] == "BadRequestError"
@@ -0,0 +1,75 @@
+import os
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import process
+from run_journal import RunJournal, load_journal
+
+QUESTIONS = [
+    {"question_number": 1, "question": "First?", "options": {"A": "x", "B": "y"}, "type": "MCQ"},
+    {"question_number": 2, "question": "Second?", "options": {"A": "x", "B": "y"}, "type": "MCQ"},
+    {"question_number": 3, "question": "Third?", "options": None, "type": "NAT"},
+]
+LIMITS = {"rpm": 6000, "tpm": None, "concurrency": 2}
+
+
+def fake_model(*replies):
+    # Stands in for call_model: returns the replies in order and reports no usage
+    replies = iter(replies)
+
+    def call_model(prompt, model_type, model_instance, model_name=None, response_info=None, *args, **kwargs):
+        response_info.update(prompt_tokens=None, completion_tokens=None, cached_tokens=None, headers=None)
+        return next(replies)
+    return call_model
+
+
+def run(questions, journal_file, resume=False, previous=None):
+    # Answers every question through a ModelEvaluator writing to the journal
+    journal = RunJournal(journal_file, resume=resume)
+    done = load_journal(journal_file) if resume else {}
+    evaluator = process.ModelEvaluator("local", "test-model", None, LIMITS, journal=journal, done=done, previous=previous, max_retries=0)
+
+    async def answer_all():
+        return [await evaluator.answer(q) for q in questions]
+
+    try:
+        return asyncio.run(answer_all()), evaluator
+    finally:
+        journal.close()
+
+
+def test_incremental_run_journals_carried_answers(tmp_path, monkeypatch):
+    journal_file = str(tmp_path / "journal.jsonl")
+    monkeypatch.setattr(process, "call_model", fake_model("A", "B", "4"))
+    first, evaluator = run(QUESTIONS, journal_file)
+    previous = {q["question_number"]: {"model_answer": answer, "fingerprint": evaluator.fingerprints[q["question_number"]]}
+                for q, answer in zip(QUESTIONS, first)}
+
+    # Incremental run: everything unchanged is carried forward, and still journaled
+    monkeypatch.setattr(process, "call_model", fake_model())
+    carried, evaluator = run(QUESTIONS, journal_file, previous=previous)
+    assert carried == first and evaluator.carried == {1, 2, 3}
+    assert {n: r["model_answer"] for n, r in load_journal(journal_file).items()} == {1: "A", 2: "B", 3: "4"}
+
+    # A resumed run (without incremental mode) finds every answer in the journal
+    resumed, evaluator = run(QUESTIONS, journal_file, resume=True)
+    assert resumed == first and evaluator.resumed == {1, 2, 3}
+
+
+def test_resume_reasks_changed_questions(tmp_path, monkeypatch):
+    journal_file = str(tmp_path / "journal.jsonl")
+    monkeypatch.setattr(process, "call_model", fake_model("A"))
+    run(QUESTIONS[:1], journal_file)
+
+    changed = [dict(QUESTIONS[0], question="First, reworded?")]
+    monkeypatch.setattr(process, "call_model", fake_model("B"))
+    answers, evaluator = run(changed, journal_file, resume=True)
+    assert answers == ["B"] and not evaluator.resumed
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    journal_file = tmp_path / "journal.jsonl"
+    journal_file.write_text('{"question_number": 1, "model_answer": "A", "fingerprint": "f"}\n{"question_number": 2, "mod')
+    assert load_journal(str(journal_file)) == {1: {"model_answer": "A", "fingerprint": "f"}}
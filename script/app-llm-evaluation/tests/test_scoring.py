@@ -0,0 +1,80 @@
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import scoring
+
+
+def evaluate_answer(q, model_answer):
+    # Per-question marking used before the vectorised engine, kept as the reference
+    if isinstance(q["answer"], list):
+        correct_answer = ";".join([ans.strip().upper() for ans in q["answer"]])
+    else:
+        correct_answer = q["answer"].strip().upper()
+
+    if q["type"] == "NAT" and isinstance(q["answer"], str) and "TO" in q["answer"].upper():
+        try:
+            a, b = [float(x.strip()) for x in q["answer"].upper().split("TO")]
+            try:
+                is_correct = a <= float(model_answer) <= b
+            except ValueError:
+                is_correct = False
+        except Exception:
+            is_correct = False
+    else:
+        is_correct = model_answer == correct_answer
+
+    marks = 0
+    if is_correct:
+        marks = q.get("marks", 0)
+    elif q["type"] == "MCQ":
+        if q.get("marks", 0) == 1:
+            marks = -0.33
+        elif q.get("marks", 0) == 2:
+            marks = -0.67
+
+    return correct_answer, is_correct, marks
+
+
+KEYS = {
+    "MCQ": ["A", "B", "C", "D"],
+    "MSQ": [["A", "C"], ["B", "C", "D"], ["d"]],
+    "NAT": ["0.5 to 0.6", "4", "2.25 TO 2.35", "-1.5", "abc"],
+}
+ANSWERS = ["A", "B", "C", "D", "A;C", "C;A", "A;A;C", "B;C;D", "D", "0.55", "4", "4.0", "4.00", "",
+           "2.3", "-1.5", "X", "abc", "ABC", None]
+
+
+def test_default_scheme_matches_reference():
+    rng = random.Random(5)
+    questions, answers = [], []
+    for n in range(5000):
+        q_type = rng.choice(list(KEYS))
+        questions.append({"question_number": n, "type": q_type, "marks": rng.choice([1, 2]), "answer": rng.choice(KEYS[q_type])})
+        answers.append(rng.choice(ANSWERS))
+
+    scored = scoring.score_answers(questions, answers)
+    for q, answer, result in zip(questions, answers, scored):
+        assert result == evaluate_answer(q, answer or ""), (q, answer)
+
+
+def test_matching_flags():
+    questions = [
+        {"type": "MSQ", "marks": 2, "answer": ["A", "C"]},
+        {"type": "MSQ", "marks": 2, "answer": ["A", "C"]},
+        {"type": "NAT", "marks": 1, "answer": "4"},
+        {"type": "NAT", "marks": 1, "answer": "4"},
+    ]
+    answers = ["C;A", "A;A;C", "4.00", "4.01"]
+
+    default = [ok for _, ok, _ in scoring.score_answers(questions, answers)]
+    assert default == [False, False, False, False]
+
+    scheme = dict(scoring.DEFAULT_SCHEME, option_set_match=True, nat_numeric_match=True)
+    flagged = [ok for _, ok, _ in scoring.score_answers(questions, answers, scheme)]
+    assert flagged == [True, True, True, False]
+
+    scheme = dict(scoring.DEFAULT_SCHEME, nat_abs_tolerance=0.05)
+    assert [ok for _, ok, _ in scoring.score_answers(questions[2:], answers[2:], scheme)] == [True, True]
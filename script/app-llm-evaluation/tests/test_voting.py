@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import scoring
+from voting import Vote
+
+
+def vote(q_type, answers):
+    v = Vote(q_type)
+    for answer in answers:
+        v.add(answer)
+    return v
+
+
+def test_msq_votes_the_sorted_option_set():
+    v = vote("MSQ", ["C;A", "A;C", "A;C"])
+    assert v.winner() == "A;C"
+    assert v.agreement() == 1
+    assert vote("MSQ", ["C;A;A", "B"]).winner() == "A;C"
+
+
+def test_nat_votes_the_most_common_raw_answer():
+    assert vote("NAT", ["4.0", "4", "4"]).winner() == "4"
+    # Ties within the group go to the answer seen first
+    assert vote("NAT", ["4.0", "4", "4.0", "4", "7"]).winner() == "4.0"
+
+
+def test_voted_answers_score_under_the_default_scheme():
+    questions = [{"type": "MSQ", "marks": 2, "answer": ["A", "C"]}, {"type": "NAT", "marks": 1, "answer": "4"}]
+    answers = [vote("MSQ", ["C;A", "A;C", "A;C"]).winner(), vote("NAT", ["4.0", "4", "4"]).winner()]
+    assert [ok for _, ok, _ in scoring.score_answers(questions, answers)] == [True, True]
+
+
+def test_largest_group_wins_ties_to_the_first():
+    assert vote("MCQ", ["B", "A", "A", "B", "C"]).winner() == "B"
+    v = vote("MCQ", ["A", "A", "B"])
+    assert v.decided(0) and not v.decided(1)
@@ -0,0 +1,61 @@
+from collections import Counter
+
+from scoring import OPTIONS_RE, to_float
+
+
+class Vote:
+    # Majority vote over the sampled answers to one question. MSQ answers vote as option sets
+    # ("C;A" == "A;C"); NAT answers within `tolerance` (relative) of a group's first value
+    # join that group. The largest group wins, ties going to the group that formed first. Its
+    # answer is the sorted option set for MSQ, otherwise the group's most common raw answer
+    # (ties going to the one seen first), so "4.0", "4", "4" votes "4".
+    def __init__(self, q_type, tolerance=0.01):
+        self.q_type = q_type
+        self.tolerance = tolerance
+        self.groups = []  # [key, Counter of raw answers, count]
+        self.count = 0
+
+    def key(self, answer):
+        if self.q_type == "MSQ" and OPTIONS_RE.fullmatch(answer):
+            return frozenset(answer.split(";"))
+        if self.q_type == "NAT":
+            value = to_float(answer)
+            if value == value:  # not NaN
+                return value
+        return answer
+
+    def same(self, a, b):
+        if isinstance(a, float) and isinstance(b, float):
+            return abs(a - b) <= self.tolerance * max(abs(a), abs(b)) or a == b
+        return a == b
+
+    def add(self, answer):
+        self.count += 1
+        key = self.key(answer)
+        for group in self.groups:
+            if self.same(group[0], key):
+                group[1][answer] += 1
+                group[2] += 1
+                return
+        self.groups.append([key, Counter([answer]), 1])
+
+    def counts(self):
+        return sorted((group[2] for group in self.groups), reverse=True) + [0, 0]
+
+    def leader_count(self):
+        return self.counts()[0]
+
+    def decided(self, remaining):
+        # The leader cannot be overturned by the samples still to be drawn
+        leader, runner_up = self.counts()[:2]
+        return leader > runner_up + remaining
+
+    def winner(self):
+        best = max(group[2] for group in self.groups)
+        key, answers, _ = next(group for group in self.groups if group[2] == best)
+        if isinstance(key, frozenset):
+            return ";".join(sorted(key))
+        return answers.most_common(1)[0][0]
+
+    def agreement(self):
+        return self.leader_count() / self.count if self.count else 0
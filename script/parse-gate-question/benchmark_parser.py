@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+from process import clean_text, parse_answers, parse_questions
+
+
+# Build a synthetic cleaned-text paper and answer key with `count` questions
+def make_document(count, seed=0):
+    rng = random.Random(seed)
+    paper = []
+    key = []
+    for n in range(1, count + 1):
+        qtype = rng.choice(["MCQ", "MSQ", "NAT"])
+        if n % 3 == 1:
+            paper.append("Computer Science and Information Technology (CS2)")
+        paper.append(f"Q.{n} Consider a directed graph G with {rng.randint(5, 500)} vertices and the following property.")
+        paper.append("Which one of the following statements is TRUE about the shortest paths in G?")
+        if qtype != "NAT":
+            for option in "ABCD":
+                paper.append(f"({option}) Statement {option} about vertex {rng.randint(1, 99)}")
+        if n % 3 == 0:
+            paper.append(f"Organising Institute: IIT Roorkee Page {n // 3} of {count // 3 + 1}")
+
+        answer = {"MCQ": rng.choice("ABCD"), "MSQ": "A;C", "NAT": f"{rng.randint(1, 9)} to {rng.randint(10, 20)}"}[qtype]
+        key.append(f"{n} 2 {qtype} CS {answer} {rng.randint(1, 2)}")
+    return "\n".join(paper), "\n".join(key)
+
+
+def benchmark(count, repeat):
+    paper, key = make_document(count)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        answers = parse_answers(clean_text(key))
+        questions = parse_questions(clean_text(paper), answers)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(questions), best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parser throughput on synthetic GATE documents")
+    parser.add_argument("--sizes", default="1000,5000,20000", help="comma-separated question counts")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per size (best time is reported)")
+    args = parser.parse_args()
+
+    print(f"{'Questions':>10} {'Parsed':>8} {'Best (s)':>10} {'Questions/sec':>15}")
+    for count in [int(size) for size in args.sizes.split(",")]:
+        parsed, elapsed = benchmark(count, args.repeat)
+        print(f"{count:>10} {parsed:>8} {elapsed:>10.4f} {parsed / elapsed:>15.0f}")
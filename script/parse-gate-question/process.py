@@ -3,38 +3,215 @@ import requests
 import json
 import re
 import os
+import time
+import shutil
+import hashlib
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
 load_dotenv()
 
 warnings.filterwarnings("ignore", message=".*CropBox missing.*")
 
+# Patterns are compiled once and shared by every call
+CS_HEADER_RE = re.compile(r"Computer Science and Information Technology \(CS\d+\)\n?")
+PAGE_FOOTER_RE = re.compile(r"Organising Institute: IIT Roorkee Page \d+ of \d+\n?")
+INSTITUTE_RE = re.compile(r"Organising Institute:.*(?:\n|$)")
+BLANK_LINES_RE = re.compile(r'\n\s*\n')
+ANSWER_LINE_RE = re.compile(r"^(\d+)\s+\d+\s+\w+\s+\S+\s+(.*)\s+\d$")
+MCQ_ANSWER_RE = re.compile(r"^[A-D]$")
+QUESTION_START_RE = re.compile(r"Q\.(\d+)")
+OPTION_RE = re.compile(r"\((A|B|C|D)\)\s*(.*?)(?=\n\(|$)", re.DOTALL)
+SKIP_QUESTION_TEXT = {"–", "", "Carry ONE mark Each", "Carry TWO marks Each"}
+
+# Pooled HTTP session shared by all downloads
+_session = None
+
+def get_session():
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+    return _session
+
+# Stream a response body to `path` in chunks, returning its SHA-256
+def stream_to_file(response, path):
+    digest = hashlib.sha256()
+    tmp_path = f"{path}.part"
+    with open(tmp_path, 'wb') as f:
+        for chunk in response.iter_content(chunk_size=1024 * 1024):
+            digest.update(chunk)
+            f.write(chunk)
+    os.replace(tmp_path, path)
+    return digest.hexdigest()
+
+# Copy `src` to `dst` unless `dst` already has the same content
+def place_file(src, dst, sha256):
+    if os.path.exists(dst) and file_sha256(dst) == sha256:
+        return
+    tmp_path = f"{dst}.{os.getpid()}.part"
+    shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dst)
+
 # Download paper
-def download_pdf(url, local_path):
+# With a `store_dir`, downloads are kept in a local artifact store: blobs/<sha256>.pdf holds the
+# content and index/<sha256(url)>.json its ETag/Last-Modified, used to revalidate on the next run.
+# In offline mode the stored copy is used without touching the network.
+def download_pdf(url, local_path, store_dir=None, offline=False):
+    local_path = os.path.expanduser(local_path)
      # Ensure the directory exists
-    os.makedirs(os.path.dirname(os.path.expanduser(local_path)), exist_ok=True)
-    response = requests.get(url)
-    response.raise_for_status()  # Raises an error for bad status
-    with open(local_path, 'wb') as f:
-        f.write(response.content)
+    os.makedirs(os.path.dirname(local_path), exist_ok=True)
+
+    if not store_dir:
+        with get_session().get(url, stream=True, timeout=60) as response:
+            response.raise_for_status()  # Raises an error for bad status
+            stream_to_file(response, local_path)
+        print(f"Downloaded File to {local_path}")
+        return
+
+    store_dir = os.path.expanduser(store_dir)
+    os.makedirs(os.path.join(store_dir, "blobs"), exist_ok=True)
+    os.makedirs(os.path.join(store_dir, "index"), exist_ok=True)
+    index_file = os.path.join(store_dir, "index", f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json")
+
+    entry = None
+    if os.path.exists(index_file):
+        with open(index_file, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    blob = os.path.join(store_dir, "blobs", f"{entry['sha256']}.pdf") if entry else None
+    if blob and not os.path.exists(blob):
+        entry, blob = None, None
+
+    if offline:
+        if not blob:
+            raise RuntimeError(f"Offline mode: no stored copy of {url} in {store_dir}")
+        place_file(blob, local_path, entry['sha256'])
+        print(f"Offline mode: using stored copy of {url} for {local_path}")
+        return
+
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    with get_session().get(url, headers=headers, stream=True, timeout=60) as response:
+        if response.status_code == 304 and blob:
+            print(f"Not modified since last download: {url}")
+        else:
+            response.raise_for_status()  # Raises an error for bad status
+            tmp_blob = os.path.join(store_dir, "blobs", f"{os.getpid()}.download")
+            sha256 = stream_to_file(response, tmp_blob)
+            blob = os.path.join(store_dir, "blobs", f"{sha256}.pdf")
+            os.replace(tmp_blob, blob)
+            entry = {
+                "url": url,
+                "sha256": sha256,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "size": os.path.getsize(blob),
+                "downloaded_at": time.time(),
+            }
+            # Per-process temporary name: corpus workers may record the same URL at once
+            tmp_index = f"{index_file}.{os.getpid()}.part"
+            with open(tmp_index, "w", encoding="utf-8") as f:
+                json.dump(entry, f, indent=2)
+            os.replace(tmp_index, index_file)
+            print(f"Downloaded {entry['size']} bytes from {url}")
+
+    place_file(blob, local_path, entry['sha256'])
     print(f"Downloaded File to {local_path}")
 
+# SHA-256 of a file, read in chunks
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Cached text of a page, or None
+def read_cached_page(page_dir, idx):
+    page_file = os.path.join(page_dir, f"{idx}.txt")
+    if not os.path.exists(page_file):
+        return None
+    with open(page_file, "r", encoding="utf-8") as f:
+        return f.read()
+
+def write_cached_page(page_dir, idx, text):
+    os.makedirs(page_dir, exist_ok=True)
+    tmp_file = os.path.join(page_dir, f"{idx}.txt.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_file, os.path.join(page_dir, f"{idx}.txt"))
+
+# Yield the text of each page in order as soon as it is extracted (or read from the page cache)
+def iter_page_texts(pdf_path, cache_dir=None):
+    page_dir = os.path.join(os.path.expanduser(cache_dir), file_sha256(pdf_path)) if cache_dir else None
+    with pdfplumber.open(pdf_path) as pdf:
+        for idx, page in enumerate(pdf.pages):
+            text = read_cached_page(page_dir, idx) if page_dir else None
+            if text is None:
+                text = page.extract_text() or ""
+                if page_dir:
+                    write_cached_page(page_dir, idx, text)
+            yield text
+
+# Extract the text of a contiguous range of pages (runs in a worker process)
+def extract_page_range(pdf_path, page_indices):
+    with pdfplumber.open(pdf_path) as pdf:
+        return [(idx, pdf.pages[idx].extract_text() or "") for idx in page_indices]
+
 #Extract all text from PDFs
-def extract_text(pdf_path):
+# Pages are spread across `workers` processes and cached per (PDF content hash, page index)
+# under `cache_dir`, so an unchanged PDF is never re-extracted.
+def extract_text(pdf_path, workers=1, cache_dir=None):
+    start = time.time()
     with pdfplumber.open(pdf_path) as pdf:
-        return "\n".join(page.extract_text() for page in pdf.pages if page.extract_text())
+        page_count = len(pdf.pages)
+
+    page_dir = os.path.join(os.path.expanduser(cache_dir), file_sha256(pdf_path)) if cache_dir else None
+    texts = {}
+    if page_dir and os.path.isdir(page_dir):
+        for idx in range(page_count):
+            text = read_cached_page(page_dir, idx)
+            if text is not None:
+                texts[idx] = text
+
+    missing = [idx for idx in range(page_count) if idx not in texts]
+    workers = max(1, min(workers, len(missing)))
+    if missing:
+        if workers > 1:
+            # Contiguous chunks so each worker opens the PDF only once
+            size = -(-len(missing) // workers)
+            chunks = [missing[k:k + size] for k in range(0, len(missing), size)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for pages in pool.map(extract_page_range, [pdf_path] * len(chunks), chunks):
+                    texts.update(pages)
+        else:
+            texts.update(extract_page_range(pdf_path, missing))
+
+        if page_dir:
+            for idx in missing:
+                write_cached_page(page_dir, idx, texts[idx])
+
+    print(f"Extracted {page_count} pages from {os.path.basename(pdf_path)} in {time.time() - start:.2f}s "
+          f"({page_count - len(missing)} cached, {len(missing)} extracted with {workers} worker(s))")
+    return "\n".join(texts[idx] for idx in range(page_count) if texts[idx])
     
 # Clean the questions and answers text
 def clean_text(text: str) -> str:
     # Remove all lines that are just the CS header
-    text = re.sub(r"Computer Science and Information Technology \(CS\d+\)\n?", "", text)
+    text = CS_HEADER_RE.sub("", text)
 
     # Remove lines like: Organising Institute: IIT Roorkee Page X of Y
-    text = re.sub(r"Organising Institute: IIT Roorkee Page \d+ of \d+\n?", "", text)
-    text = re.sub(r"Organising Institute:.*(?:\n|$)", "", text)
+    text = PAGE_FOOTER_RE.sub("", text)
+    text = INSTITUTE_RE.sub("", text)
 
     # Optional: strip excessive blank lines
-    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = BLANK_LINES_RE.sub('\n\n', text)
     
 
     return text.strip()
@@ -44,79 +221,114 @@ def clean_text(text: str) -> str:
 def parse_answers(answer_text):
     answers = {}
     for line in answer_text.splitlines():
-        match = re.match(r"^(\d+)\s+\d+\s+\w+\s+\S+\s+(.*)\s+\d$", line)
+        match = ANSWER_LINE_RE.match(line)
         if match:
             qid = f"Q{match.group(1)}"
-            answer = match.group(2) or match.group(3)
+            answer = match.group(2)
             if ";" in answer:  # MSQ
                 answers[qid] = answer.split(";")
-            elif re.match(r"^[A-D]$", answer):  # MCQ
-                answers[qid] = answer
-            else:  # NAT
+            else:  # MCQ or NAT
                 answers[qid] = answer
     return answers
 
-#Parse questions
-def parse_questions(text, answer_dict):
-    question_blocks = re.findall(r"(Q\.\d+[\s\S]*?)(?=Q\.\d+|\Z)", text)
-    questions = []
+# Marks based on question number
+def question_marks(q_number):
+    if 1 <= q_number <= 5 or 11 <= q_number <= 35:
+        return 1
+    elif 6 <= q_number <= 10 or 36 <= q_number <= 65:
+        return 2
+    else:
+        return 1  # default fallback
 
-    for block in question_blocks:
-        q_match = re.match(r"Q\.(\d+)\s+(.*)", block.strip(), re.DOTALL)
-        if not q_match:
-            continue
-
-        q_number = int(q_match.group(1))
-        qid = f"Q{q_number}"
-        content = q_match.group(2).strip()
-
-        # Extract options
-        options = dict(re.findall(r"\((A|B|C|D)\)\s*(.*?)(?=\n\(|$)", content, re.DOTALL))
-
-        # Extract question text
-        split_match = re.split(r"\(A\)", content)
-        question_text = split_match[0].strip() if split_match else content.strip()
-        
-        # Skip meta text or garbage
-        if question_text in {"–", "", "Carry ONE mark Each", "Carry TWO marks Each"}:
-            continue
-
-        # Get the answer (if available)
-        answer = answer_dict.get(qid, None)
-
-        # Determine type from answer
-        if isinstance(answer, list):
-            qtype = "MSQ"
-        elif isinstance(answer, str) and re.match(r"^[A-D]$", answer):
-            qtype = "MCQ"
-        elif answer is not None:
-            qtype = "NAT"
-        else:
-            qtype = "Unknown"
-        
-        # Determine marks based on question number
-        if 1 <= q_number <= 5 or 11 <= q_number <= 35:
-            marks = 1
-        elif 6 <= q_number <= 10 or 36 <= q_number <= 65:
-            marks = 2
-        else:
-            marks = 1  # default fallback
+# Build a question record from one "Q.<n> ..." block, or None for meta text/garbage
+def build_question(q_number, block, answer_dict):
+    # The question number must be followed by whitespace
+    rest = block.strip()[len(f"Q.{q_number}"):]
+    if not rest or not rest[0].isspace():
+        return None
+    content = rest.strip()
 
+    # Extract options
+    options = dict(OPTION_RE.findall(content))
 
-        questions.append({
-            "question_number": q_number,
-            "question": question_text,
-            "options": options,
-            "type": qtype,
-            "marks": marks,
-            "answer": answer
-        })
+    # Extract question text (everything before the first option)
+    question_text = content.partition("(A)")[0].strip()
 
-    return questions
+    # Skip meta text or garbage
+    if question_text in SKIP_QUESTION_TEXT:
+        return None
 
-def extractProcess(i):
-    env = i['env']
+    # Get the answer (if available)
+    qid = f"Q{q_number}"
+    answer = answer_dict.get(qid, None)
+
+    # Determine type from answer
+    if isinstance(answer, list):
+        qtype = "MSQ"
+    elif isinstance(answer, str) and MCQ_ANSWER_RE.match(answer):
+        qtype = "MCQ"
+    elif answer is not None:
+        qtype = "NAT"
+    else:
+        qtype = "Unknown"
+
+    return {
+        "question_number": int(q_number),
+        "question": question_text,
+        "options": options,
+        "type": qtype,
+        "marks": question_marks(int(q_number)),
+        "answer": answer
+    }
+
+class QuestionParser:
+    # Single-pass incremental parser: cleaned text is fed in chunks and each question is
+    # emitted as soon as the next "Q.<n>" marker shows where its block ends. Only the
+    # still-open last block is kept (and rescanned) between feeds.
+    def __init__(self, answer_dict):
+        self.answer_dict = answer_dict
+        self.buffer = ""
+
+    def feed(self, text):
+        self.buffer += text
+        questions = []
+        markers = list(QUESTION_START_RE.finditer(self.buffer))
+        if not markers:
+            # Text before the first question is dropped; keep enough for a split marker
+            self.buffer = self.buffer[-2:]
+            return questions
+
+        for marker, next_marker in zip(markers, markers[1:]):
+            question = build_question(marker.group(1), self.buffer[marker.start():next_marker.start()], self.answer_dict)
+            if question:
+                questions.append(question)
+        self.buffer = self.buffer[markers[-1].start():]
+        return questions
 
+    def close(self):
+        # The last block runs to the end of the text
+        questions = self.feed("")
+        marker = QUESTION_START_RE.match(self.buffer)
+        if marker:
+            question = build_question(marker.group(1), self.buffer, self.answer_dict)
+            if question:
+                questions.append(question)
+        self.buffer = ""
+        return questions
+
+# Yield question records from an iterable of cleaned text chunks
+def iter_questions(chunks, answer_dict):
+    parser = QuestionParser(answer_dict)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+#Parse questions
+def parse_questions(text, answer_dict):
+    return list(iter_questions([text], answer_dict))
+
+# Download the question paper and answer key named by the environment; returns their local paths
+def download_papers(env):
     # Get input paths from environment
     question_pdf = os.path.expanduser(env.get('MLC_GATE_QUESTION_PDF_PATH', '~/MLC/repos/local/cache/gate-exam-data/paper.pdf'))
     answer_pdf = os.path.expanduser(env.get('MLC_GATE_ANSWER_PDF_PATH', '~/MLC/repos/local/cache/gate-exam-data/key.pdf'))
@@ -124,22 +336,47 @@ def extractProcess(i):
     # Download the paper from site
     questionpdf_url = env.get('MLC_GATE_QUESTION_PDF_URL', "https://github.com/user-attachments/files/20423322/CS25set2-questionPaper.pdf")
     answerpdf_url = env.get('MLC_GATE_ANSWER_PDF_URL', "https://github.com/user-attachments/files/20423320/CS25set2-answerKey.pdf")
+    store_dir = env.get('MLC_GATE_ARTIFACT_DIR', '~/MLC/repos/local/cache/gate-exam-data/artifacts')
+    offline = env.get('MLC_GATE_OFFLINE', 'no').lower() in ('yes', 'true', '1', 'on')
     print("Downloading Question Paper PDF ..")
-    download_pdf(questionpdf_url, question_pdf)
+    download_pdf(questionpdf_url, question_pdf, store_dir, offline)
     print("Downloading Answer Key PDF ..")
-    download_pdf(answerpdf_url, answer_pdf)
+    download_pdf(answerpdf_url, answer_pdf, store_dir, offline)
     # print("DEBUG: Skipping downloading PDFs")
+    return question_pdf, answer_pdf
+
+# Yield questions while the question paper is still being extracted, page by page.
+# The answer key (a page or two) is parsed first since it determines the question types.
+# Pages are cleaned one at a time, so whitespace at page boundaries can differ slightly
+# from extractProcess, which cleans the whole document at once.
+def stream_questions(env):
+    question_pdf, answer_pdf = download_papers(env)
+    cache_dir = get_page_cache_dir(env)
+    answer_key = parse_answers(clean_text(extract_text(answer_pdf, 1, cache_dir)))
+
+    parser = QuestionParser(answer_key)
+    for page_text in iter_page_texts(question_pdf, cache_dir):
+        page_text = clean_text(page_text)
+        if page_text:
+            yield from parser.feed(page_text + "\n")
+    yield from parser.close()
+
+def extractProcess(i):
+    env = i['env']
+    question_pdf, answer_pdf = download_papers(env)
 
     # Extract and clean text
     print("Extracting text from PDFs...")
-    qtext = extract_text(question_pdf)
+    workers = int(env.get('MLC_GATE_EXTRACT_WORKERS', os.cpu_count() or 1))
+    cache_dir = get_page_cache_dir(env)
+    qtext = extract_text(question_pdf, workers, cache_dir)
     cleaned_qtext = clean_text(qtext)
-    atext = extract_text(answer_pdf)
+    atext = extract_text(answer_pdf, workers, cache_dir)
     cleaned_atext = clean_text(atext)
     
-    # Parse answers and questions
+    # Parse answers; questions are parsed lazily while outputProcess writes them
     answer_key = parse_answers(cleaned_atext)
-    questions = parse_questions(cleaned_qtext, answer_key)
+    questions = iter_questions([cleaned_qtext], answer_key)
     
     # Store in state
     i['state']['questions'] = questions
@@ -147,26 +384,166 @@ def extractProcess(i):
     
     return {'return': 0}
 
+# Page cache directory from the environment, or None when disabled
+def get_page_cache_dir(env):
+    cache_dir = env.get('MLC_GATE_PAGE_CACHE_DIR', '~/MLC/repos/local/cache/gate-exam-data/page-cache')
+    if cache_dir.lower() in ('', 'off', 'no'):
+        return None
+    return cache_dir
+
+# Download and parse one manifest entry (runs in a corpus worker process)
+def parse_paper(entry, work_dir, store_dir, offline, cache_dir):
+    paper_id = f"{entry['year']}-{entry['subject']}-{entry.get('set', 1)}"
+    question_pdf = os.path.join(work_dir, f"{paper_id}-paper.pdf")
+    answer_pdf = os.path.join(work_dir, f"{paper_id}-key.pdf")
+    download_pdf(entry['question_url'], question_pdf, store_dir, offline)
+    download_pdf(entry['answer_url'], answer_pdf, store_dir, offline)
+
+    # Papers are already spread across processes, so pages are extracted serially here
+    answer_key = parse_answers(clean_text(extract_text(answer_pdf, 1, cache_dir)))
+    questions = parse_questions(clean_text(extract_text(question_pdf, 1, cache_dir)), answer_key)
+    for q in questions:
+        q.update({"paper_id": paper_id, "year": entry['year'], "subject": entry['subject'], "set": entry.get('set', 1)})
+
+    paper = {
+        "paper_id": paper_id,
+        "year": entry['year'],
+        "subject": entry['subject'],
+        "set": entry.get('set', 1),
+        "question_url": entry['question_url'],
+        "answer_url": entry['answer_url'],
+        "question_count": len(questions),
+    }
+    return paper, questions
+
+# Index of question positions by paper, year, subject, question type and marks
+def build_index(questions):
+    index = {"paper_id": {}, "year": {}, "subject": {}, "type": {}, "marks": {}}
+    for pos, q in enumerate(questions):
+        for field, values in index.items():
+            values.setdefault(str(q[field]), []).append(pos)
+    return index
+
+# Select questions from a corpus dataset, e.g. filters={"year": "2025", "type": "NAT"}
+def select_questions(dataset, filters):
+    positions = None
+    for field, value in filters.items():
+        if field not in dataset['index']:
+            raise ValueError(f"Cannot select on '{field}'. Choose from {', '.join(dataset['index'])}.")
+        matched = set(dataset['index'][field].get(str(value), []))
+        positions = matched if positions is None else positions & matched
+    if positions is None:
+        positions = range(len(dataset['questions']))
+    return [dataset['questions'][pos] for pos in sorted(positions)]
+
+# Parse every paper listed in a manifest into one indexed dataset.
+# Manifest: JSON list of {"year", "subject", "set", "question_url", "answer_url"}
+def corpusProcess(i):
+    env = i['env']
+    start = time.time()
+
+    manifest_path = os.path.expanduser(env['MLC_GATE_CORPUS_MANIFEST'])
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    output_path = os.path.expanduser(env.get('MLC_GATE_CORPUS_PATH', '~/MLC/repos/local/cache/gate-exam-data/corpus.json'))
+    work_dir = os.path.join(os.path.dirname(output_path), "corpus-pdfs")
+    os.makedirs(work_dir, exist_ok=True)
+    store_dir = env.get('MLC_GATE_ARTIFACT_DIR', '~/MLC/repos/local/cache/gate-exam-data/artifacts')
+    offline = env.get('MLC_GATE_OFFLINE', 'no').lower() in ('yes', 'true', '1', 'on')
+    cache_dir = get_page_cache_dir(env)
+    workers = max(1, min(int(env.get('MLC_GATE_CORPUS_WORKERS', os.cpu_count() or 1)), len(manifest)))
+
+    print(f"Parsing {len(manifest)} papers from {manifest_path} with {workers} worker(s)..")
+    papers = []
+    questions = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(parse_paper, entry, work_dir, store_dir, offline, cache_dir) for entry in manifest]
+        # Collect in manifest order so the dataset is deterministic
+        for future in futures:
+            paper, paper_questions = future.result()
+            print(f"Parsed {paper['paper_id']}: {len(paper_questions)} questions")
+            papers.append(paper)
+            questions.extend(paper_questions)
+
+    dataset = {"papers": papers, "questions": questions, "index": build_index(questions)}
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(dataset, f, indent=2, ensure_ascii=False)
+
+    print("********************************************************************************************************************************")
+    print(f"Generated {output_path} with {len(questions)} questions from {len(papers)} papers in {time.time() - start:.2f}s")
+    print("********************************************************************************************************************************")
+    return {'return': 0}
+
+# Load a slice of an existing corpus instead of parsing a paper.
+# MLC_GATE_CORPUS_SLICE='year=2025,subject=cse,type=NAT'
+def sliceProcess(i):
+    env = i['env']
+    corpus_path = os.path.expanduser(env.get('MLC_GATE_CORPUS_PATH', '~/MLC/repos/local/cache/gate-exam-data/corpus.json'))
+    with open(corpus_path, "r", encoding="utf-8") as f:
+        dataset = json.load(f)
+
+    filters = dict(item.split("=", 1) for item in env['MLC_GATE_CORPUS_SLICE'].split(",") if item.strip())
+    filters = {field.strip(): value.strip() for field, value in filters.items()}
+    questions = [dict(q) for q in select_questions(dataset, filters)]
+
+    # Question numbers are only unique within a paper, so renumber slices spanning several papers
+    if len({q['paper_id'] for q in questions}) > 1:
+        for number, q in enumerate(questions, start=1):
+            q['paper_question_number'] = q['question_number']
+            q['question_number'] = number
+
+    print(f"Selected {len(questions)} questions from {corpus_path} ({env['MLC_GATE_CORPUS_SLICE']})")
+    i['state']['questions'] = questions
+    return {'return': 0}
+
+# Write question records one at a time as they are produced.
+# jsonl: one record per line; json: the same indented array json.dump(questions, indent=2) writes
+def write_questions(questions, f, output_format):
+    written = []
+    for q in questions:
+        if output_format == "jsonl":
+            f.write(json.dumps(q, ensure_ascii=False) + "\n")
+        else:
+            record = json.dumps(q, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+            f.write(("[\n  " if not written else ",\n  ") + record)
+        f.flush()
+        written.append(q)
+
+    if output_format != "jsonl":
+        f.write("\n]" if written else "[]")
+    return written
+
 def outputProcess(i):
     env = i['env']
     state = i['state']
     
     questions = state['questions']
-    output_path = os.path.expanduser(env.get('MLC_GATE_OUTPUT_JSON_PATH', '~/MLC/repos/local/cache/gate-exam-data/output.json'))
+    output_path = os.path.expanduser(env.get('MLC_GATE_OUTPUT_JSON_PATH', '~/MLC/repos/local/cache/gate-exam-data/output.jsonl'))
+    output_format = env.get('MLC_GATE_OUTPUT_FORMAT', 'jsonl').lower()
+    if output_format not in ('json', 'jsonl'):
+        raise ValueError("Invalid MLC_GATE_OUTPUT_FORMAT. Choose from 'json' or 'jsonl'.")
     
     # Ensure output directory exists
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
-    # Save to JSON
+    # Save to JSON/JSONL, streaming records as they are parsed
     with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(questions, f, indent=2, ensure_ascii=False)
+        questions = write_questions(questions, f, output_format)
+    state['questions'] = questions
     
     print("********************************************************************************************************************************")
-    print(f"Generated {output_path} with {len(questions)} questions.")
+    print(f"Generated {output_path} with {len(questions)} questions ({output_format}).")
     print("********************************************************************************************************************************")
     return {'return': 0}
 
 if __name__ == "__main__":
     i = {'env': os.environ, 'state': {}}
-    extractProcess(i)
-    outputProcess(i)
+    if os.environ.get('MLC_GATE_CORPUS_MANIFEST'):
+        corpusProcess(i)
+    elif os.environ.get('MLC_GATE_CORPUS_SLICE'):
+        sliceProcess(i)
+        outputProcess(i)
+    else:
+        extractProcess(i)
+        outputProcess(i)
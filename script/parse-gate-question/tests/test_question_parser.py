@@ -0,0 +1,125 @@
+import os
+import re
+import sys
+import importlib.util
+
+spec = importlib.util.spec_from_file_location("parse_gate_question", os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "process.py"))
+parser = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(parser)
+
+
+def reference_parse_answers(answer_text):
+    # parse_answers as it was before the single-pass parser, kept as the reference
+    answers = {}
+    for line in answer_text.splitlines():
+        match = re.match(r"^(\d+)\s+\d+\s+\w+\s+\S+\s+(.*)\s+\d$", line)
+        if match:
+            qid = f"Q{match.group(1)}"
+            answer = match.group(2)
+            if ";" in answer:
+                answers[qid] = answer.split(";")
+            else:
+                answers[qid] = answer
+    return answers
+
+
+def reference_parse_questions(text, answer_dict):
+    # Multi-pass parse_questions used before the single-pass parser, kept as the reference
+    questions = []
+    for block in re.findall(r"(Q\.\d+[\s\S]*?)(?=Q\.\d+|\Z)", text):
+        q_match = re.match(r"Q\.(\d+)\s+(.*)", block.strip(), re.DOTALL)
+        if not q_match:
+            continue
+        q_number = int(q_match.group(1))
+        content = q_match.group(2).strip()
+        options = dict(re.findall(r"\((A|B|C|D)\)\s*(.*?)(?=\n\(|$)", content, re.DOTALL))
+        question_text = re.split(r"\(A\)", content)[0].strip()
+        if question_text in {"–", "", "Carry ONE mark Each", "Carry TWO marks Each"}:
+            continue
+        answer = answer_dict.get(f"Q{q_number}", None)
+        if isinstance(answer, list):
+            qtype = "MSQ"
+        elif isinstance(answer, str) and re.match(r"^[A-D]$", answer):
+            qtype = "MCQ"
+        elif answer is not None:
+            qtype = "NAT"
+        else:
+            qtype = "Unknown"
+        if 1 <= q_number <= 5 or 11 <= q_number <= 35:
+            marks = 1
+        elif 6 <= q_number <= 10 or 36 <= q_number <= 65:
+            marks = 2
+        else:
+            marks = 1
+        questions.append({"question_number": q_number, "question": question_text, "options": options,
+                          "type": qtype, "marks": marks, "answer": answer})
+    return questions
+
+
+# Cleaned text laid out like a GATE paper: a preamble, section headers that look like
+# questions, options spanning lines, a "Q.<n>" reference inside a question (which splits
+# the block, as it always has), a marker without whitespace after it, an unanswered question
+# and a question number outside the known ranges
+PAPER = """General Aptitude (GA)
+Q.1 – Q.5 Carry ONE mark Each
+Q.1 Choose the word that best completes the sentence.
+(A) apple
+(B) banana
+(C) cherry
+(D) date
+Q.2 Which of the following are prime numbers?
+(A) 2
+(B) 4
+(C) 5 and a line that
+wraps onto the next
+(D) 9
+Q.3 The value of 7 / 2 is ________. (rounded off to one decimal place)
+
+Q.6 – Q.10 Carry TWO marks Each
+Q.6 A train covers 120 km in 2 hours. Its speed in km/h is ________.
+Q.7 See Q.3 for the definition used here.
+(A) first
+(B) second
+(C) third
+(D) fourth
+Q.36Q.37 Consider the grammar (A) S -> a (B) S -> b
+(A) only (A)
+(B) only (B)
+(C) both
+(D) neither
+Q.70 A question past the last numbered range.
+(A) yes
+(B) no
+Q.12 –
+Q.13"""
+
+KEY = """Q. No. Session Question Type Section Key/Range Marks
+1 2 MCQ GA A 1
+2 2 MSQ GA A;C 1
+3 2 NAT GA 3.4 to 3.6 1
+6 2 NAT GA 60 2
+7 2 MCQ GA B 2
+37 2 MCQ CS D 2
+not a key line"""
+
+
+def test_answers_match_reference():
+    assert parser.parse_answers(KEY) == reference_parse_answers(KEY)
+
+
+def test_questions_match_reference():
+    answers = parser.parse_answers(KEY)
+    expected = reference_parse_questions(PAPER, answers)
+    assert [q["question_number"] for q in expected] == [1, 2, 3, 6, 7, 3, 37, 70]
+    assert parser.parse_questions(PAPER, answers) == expected
+
+
+def test_chunked_input_matches_reference():
+    # Every split point, including those inside a "Q.<n>" marker, and small fixed chunk sizes
+    answers = parser.parse_answers(KEY)
+    expected = reference_parse_questions(PAPER, answers)
+    for split in range(len(PAPER) + 1):
+        assert list(parser.iter_questions([PAPER[:split], PAPER[split:]], answers)) == expected, split
+    for size in (1, 2, 3, 5, 8, 13):
+        chunks = [PAPER[start:start + size] for start in range(0, len(PAPER), size)]
+        assert list(parser.iter_questions(chunks, answers)) == expected, size